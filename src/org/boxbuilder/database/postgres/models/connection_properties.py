@@ -1,8 +1,10 @@
+import functools
 import os
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 
-class ConnectionProperties(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ConnectionProperties:
     """
     A class to represent the properties required for a PostgreSQL connection.
 
@@ -43,6 +45,7 @@ class ConnectionProperties(BaseModel):
         return f"{base_url}/{database_name}"
 
 
+@functools.lru_cache(maxsize=1)
 def build_from_env_variables() -> ConnectionProperties:
     """
     Constructs a `ConnectionProperties` object using environment variables.
@@ -55,6 +58,9 @@ def build_from_env_variables() -> ConnectionProperties:
     If any of the first three environment variables (`POSTGRES_DB_URL`, `POSTGRES_DB_USER_NAME`, `POSTGRES_DB_PASSWORD`) are missing,
     this function raises a `ValueError`.
 
+    The environment variables are only read on the first successful call; later calls return the same
+    `ConnectionProperties` object. Call `build_from_env_variables.cache_clear()` after changing them.
+
     Returns:
     ConnectionProperties: A `ConnectionProperties` object containing the values from the environment variables.
 
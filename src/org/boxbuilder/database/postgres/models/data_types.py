@@ -2,8 +2,10 @@ import json
 from enum import Enum
 from datetime import datetime, date, time
 from decimal import Decimal
-from typing import Any, Optional, Union
+from typing import Any, Callable, Optional, Union
 
+import pandas as pd
+from pandas.api.types import infer_dtype, is_bool_dtype, is_datetime64_any_dtype
 from pydantic import BaseModel
 
 _TIME_DATA_TYPE_FORMATS = {
@@ -13,6 +15,70 @@ _TIME_DATA_TYPE_FORMATS = {
     "TIMESTAMP WITH TIME ZONE": "%Y-%m-%d %H:%M:%S%z",
 }
 
+# The configured formats are all ISO 8601 compatible, so the C `fromisoformat` parsers are
+# tried first and `strptime` is only used for inputs they reject.
+_TIME_DATA_TYPE_ISO_PARSERS = {
+    "TIME": time.fromisoformat,
+    "DATE": date.fromisoformat,
+    "TIMESTAMP": datetime.fromisoformat,
+    "TIMESTAMP WITH TIME ZONE": datetime.fromisoformat,
+}
+
+
+def _convert_text(value: Any) -> str:
+    return str(value)
+
+
+def _convert_number(value: Any) -> Decimal:
+    return Decimal(value)
+
+
+def _convert_boolean(value: Any) -> bool:
+    if isinstance(value, str):
+        if value.upper() == "TRUE":
+            return True
+        elif value.upper() == "FALSE":
+            return False
+        else:
+            raise RuntimeError(f"Unable to convert {value} into boolean.")
+    return bool(value)
+
+
+# Shared instances of the C accelerated codec, skipping the argument handling of `json.loads`
+# and `json.dumps` on every value.
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ENCODER = json.JSONEncoder()
+
+
+def _convert_json(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        # The string is sent to the database as is; parsing only validates it.
+        try:
+            _JSON_DECODER.decode(value)
+        except Exception as e:
+            raise RuntimeError(f"Invalid JSON string found. Parsing error: {e}")
+        return value
+    elif isinstance(value, BaseModel):
+        return value.model_dump_json()
+    else:
+        return _JSON_ENCODER.encode(value)
+
+
+def _map_values(values: pd.Series, function: Callable[[Any], Any]) -> pd.Series:
+    # Iterating a series yields Python scalars (not the numpy ones `astype("object")` can hold for
+    # extension dtypes), as converting each value does. Unlike `Series.map`, the results are not
+    # inferred back into a dtype, so e.g. datetimes are not turned into Timestamps.
+    return pd.Series([function(v) for v in values], index=values.index, dtype="object")
+
+
+# Converters for the non date/time data types, keyed by data type name.
+_CONVERTERS = {
+    "TEXT": _convert_text,
+    "NUMERIC": _convert_number,
+    "BOOLEAN": _convert_boolean,
+    "JSONB": _convert_json,
+}
+
 
 class DataTypes(Enum):
     """
@@ -30,6 +96,8 @@ class DataTypes(Enum):
     Methods:
     validate_and_convert(value: Any) -> Optional[Any]:
         Validates and converts the given value to the corresponding data type.
+    convert_series(series: pd.Series) -> pd.Series:
+        Validates and converts every value of the given series to the corresponding data type.
     """
 
     TIME = ("TIME", "string")
@@ -51,6 +119,18 @@ class DataTypes(Enum):
         """
         self._name = name
         self.pandas_dtype = pandas_dtype
+        # Per member constants for the date/time conversions, looked up once here.
+        self._time_format = _TIME_DATA_TYPE_FORMATS.get(name)
+        self._iso_parser = _TIME_DATA_TYPE_ISO_PARSERS.get(name)
+        self._is_date = name == "DATE"
+        self._is_time = name == "TIME"
+        self._requires_timezone = name == "TIMESTAMP WITH TIME ZONE"
+        self._forbids_timezone = name == "TIMESTAMP"
+        # Resolved once per member so `validate_and_convert` doesn't compare against every member.
+        if self._time_format is not None:
+            self._convert = self._validate_and_convert_datetime
+        else:
+            self._convert = _CONVERTERS.get(name, self._raise_unsupported)
 
     def validate_and_convert(self, value: Any) -> Optional[Any]:
         """
@@ -67,42 +147,88 @@ class DataTypes(Enum):
         """
         if value is None:
             return None
+        return self._convert(value)
+
+    def convert_series(self, series: pd.Series) -> pd.Series:
+        """
+        Validates and converts every value of the given series to the corresponding data type.
 
+        The conversion is done column-wise where the series content allows it, and falls back
+        to `validate_and_convert` per value otherwise, so the results (and errors) are the same
+        as converting each value individually.
+
+        Parameters:
+        series (pd.Series): The values to be validated and converted.
+
+        Returns:
+        pd.Series: An object series with the converted values. Missing values (None, NaN, NaT)
+                   are returned as None.
+
+        Raises:
+        ValueError: If a value cannot be converted to the expected data type.
+        """
+        not_null = series.notna()
+        result = pd.Series([None] * len(series), index=series.index, dtype="object")
+        if not_null.any():
+            converted = self._convert_non_null_series(series[not_null])
+            result.loc[not_null] = converted.to_numpy(dtype="object")
+        return result
+
+    def _convert_non_null_series(self, values: pd.Series) -> pd.Series:
         if self == DataTypes.TEXT:
-            return str(value)
+            return values.astype("object").astype(str)
         if self == DataTypes.NUMBER:
-            return Decimal(value)
+            return _map_values(values, Decimal)
         if self == DataTypes.BOOLEAN:
-            if isinstance(value, str):
-                if value.upper() == "TRUE":
-                    return True
-                elif value.upper() == "FALSE":
-                    return False
-                else:
-                    raise RuntimeError(f"Unable to convert {value} into boolean.")
-            return bool(value)
-        if self == DataTypes.JSON:
-            if isinstance(value, str):
-                try:
-                    json.loads(value)
-                except Exception as e:
-                    raise RuntimeError(f"Invalid JSON string found. Parsing error: {e}")
-            elif isinstance(value, BaseModel):
-                return value.model_dump_json()
-            else:
-                return json.dumps(value)
-        if self in {
-            DataTypes.TIMESTAMP,
-            DataTypes.TIMESTAMP_WITH_TIMEZONE,
-            DataTypes.DATE,
-            DataTypes.TIME,
-        }:
-            return self._validate_and_convert_datetime(value)
+            if is_bool_dtype(values) or infer_dtype(values) == "boolean":
+                return _map_values(values, bool)
+            if infer_dtype(values) == "string":
+                converted = values.str.upper().map({"TRUE": True, "FALSE": False})
+                invalid = converted.isna()
+                if invalid.any():
+                    raise RuntimeError(
+                        f"Unable to convert {values[invalid].iloc[0]} into boolean."
+                    )
+                return converted
+        if self._time_format is not None:
+            converted = self._convert_datetime_series(values)
+            if converted is not None:
+                return converted
 
+        return _map_values(values, self.validate_and_convert)
+
+    def _convert_datetime_series(self, values: pd.Series) -> Optional[pd.Series]:
+        if is_datetime64_any_dtype(values):
+            parsed = values
+        elif infer_dtype(values) == "string":
+            try:
+                parsed = pd.to_datetime(values, format=self._time_format)
+            except (ValueError, TypeError):
+                # Let the per value path report the offending value.
+                return None
+        else:
+            return None
+
+        has_timezone = parsed.dt.tz is not None
+        if self._is_date:
+            return parsed.dt.date
+        if self._is_time:
+            return parsed.dt.time
+        if self._requires_timezone and not has_timezone:
+            return None
+        if self._forbids_timezone and has_timezone:
+            return None
+        if parsed is values:
+            return values.astype("object")
+        return pd.Series(
+            parsed.dt.to_pydatetime(), index=values.index, dtype="object"
+        )
+
+    def _raise_unsupported(self, value: Any):
         raise RuntimeError(f"Unsupported data type {self._name}")
 
     def _validate_and_convert_datetime(self, value: Any) -> Optional[Any]:
-        format_str = _TIME_DATA_TYPE_FORMATS.get(self._name)
+        format_str = self._time_format
         if format_str is None:
             raise RuntimeError(
                 f"Timestamp format not configured for data type: {self._name}"
@@ -113,12 +239,15 @@ class DataTypes(Enum):
 
         if isinstance(value, str):
             try:
-                parsed_value = datetime.strptime(value, format_str)
-                return self._coerce_to_appropriate_datetime_type(parsed_value)
+                parsed_value = self._iso_parser(value)
             except ValueError:
-                raise ValueError(
-                    f"Invalid format for {self._name}: {value}. Expected format: {format_str}"
-                )
+                try:
+                    parsed_value = datetime.strptime(value, format_str)
+                except ValueError:
+                    raise ValueError(
+                        f"Invalid format for {self._name}: {value}. Expected format: {format_str}"
+                    )
+            return self._coerce_to_appropriate_datetime_type(parsed_value)
 
         raise ValueError(
             f"Invalid type for {self._name}: {type(value)}. Expected string, datetime, date, or time."
@@ -127,7 +256,7 @@ class DataTypes(Enum):
     def _coerce_to_appropriate_datetime_type(
         self, parsed_value: Union[datetime, date, time]
     ) -> Union[datetime, date, time]:
-        if self == DataTypes.DATE:
+        if self._is_date:
             if isinstance(parsed_value, datetime):
                 return parsed_value.date()
             if isinstance(parsed_value, date):
@@ -135,7 +264,7 @@ class DataTypes(Enum):
             raise RuntimeError(
                 f"Unable to convert {type(parsed_value)} into datetime.date format."
             )
-        if self == DataTypes.TIME:
+        if self._is_time:
             if isinstance(parsed_value, datetime):
                 return parsed_value.time()
             if isinstance(parsed_value, time):
@@ -144,11 +273,11 @@ class DataTypes(Enum):
                 f"Unable to convert {type(parsed_value)} into datetime.time format."
             )
 
-        if self == DataTypes.TIMESTAMP_WITH_TIMEZONE and parsed_value.tzinfo is None:
+        if self._requires_timezone and parsed_value.tzinfo is None:
             raise ValueError(
                 f"TIMESTAMP WITH TIME ZONE requires a timezone: {parsed_value}"
             )
-        if self == DataTypes.TIMESTAMP and parsed_value.tzinfo is not None:
+        if self._forbids_timezone and parsed_value.tzinfo is not None:
             raise ValueError(f"TIMESTAMP should not have a timezone: {parsed_value}")
 
         return parsed_value
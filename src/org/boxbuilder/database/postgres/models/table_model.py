@@ -1,11 +1,11 @@
-from typing import Dict, List, Optional
-
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
 
 from org.boxbuilder.database.postgres.models.data_types import DataTypes
 
 
-class TableModel(BaseModel):
+@dataclass(slots=True, frozen=True)
+class TableModel:
     """
     Represents a table or view within a specific database schema, including the table's
     name, columns, and data types, as well as other metadata such as primary keys and
@@ -25,13 +25,40 @@ class TableModel(BaseModel):
     get_fqn() -> str:
         Returns the fully qualified name (FQN) of the table or view in the format:
         `"<schema>"."<table>`, where each part is quoted.
+
+    Derived attributes (computed once at construction):
+    fqn (str): The fully qualified name returned by `get_fqn()`.
+    columns_ddl (str): The comma separated `"<column>" <TYPE>` definitions of the columns.
+    primary_keys_set (FrozenSet[str]): The primary key column names, empty if there are none.
     """
 
     database: str
     schema: str
     table: str
     primary_keys: Optional[List[str]] = None
-    column_name_to_data_type_map: Dict[str, DataTypes] = Field(default_factory=dict)
+    column_name_to_data_type_map: Dict[str, DataTypes] = field(default_factory=dict)
+    fqn: str = field(init=False, repr=False, compare=False)
+    columns_ddl: str = field(init=False, repr=False, compare=False)
+    primary_keys_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # The model is frozen, so the derived attributes are set through object.__setattr__.
+        object.__setattr__(
+            self, "fqn", ".".join([f'"{part}"' for part in [self.schema, self.table]])
+        )
+        object.__setattr__(
+            self,
+            "columns_ddl",
+            ",".join(
+                [
+                    f'"{c}" {d.value[0]}'
+                    for c, d in self.column_name_to_data_type_map.items()
+                ]
+            ),
+        )
+        object.__setattr__(
+            self, "primary_keys_set", frozenset(self.primary_keys or [])
+        )
 
     def get_fqn(self) -> str:
         """
@@ -46,4 +73,4 @@ class TableModel(BaseModel):
         >>> table.get_fqn()
         '"public"."users"'
         """
-        return ".".join([f'"{part}"' for part in [self.schema, self.table]])
+        return self.fqn
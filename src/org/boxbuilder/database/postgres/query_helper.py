@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from typing import Optional, Any, List, Dict, Set, Tuple
+from collections import defaultdict
+from typing import Optional, Any, AsyncIterator, Callable, List, Dict, Mapping, Set, Tuple
 
 import asyncpg
 import pandas as pd
@@ -16,39 +17,131 @@ from org.boxbuilder.utils.default_utils import coalesce
 
 _LOG = logging.getLogger(__name__)
 
+# Keyed by the lower case names `information_schema.columns.data_type` reports.
 _POSTGRES_TYPE_TO_ENUM = {
-    "TEXT": DataTypes.TEXT,
-    "VARCHAR": DataTypes.TEXT,
-    "CHAR": DataTypes.TEXT,
-    "BOOLEAN": DataTypes.BOOLEAN,
-    "NUMERIC": DataTypes.NUMBER,
-    "DECIMAL": DataTypes.NUMBER,
-    "REAL": DataTypes.NUMBER,
-    "DOUBLE PRECISION": DataTypes.NUMBER,
-    "INTEGER": DataTypes.NUMBER,
-    "BIGINT": DataTypes.NUMBER,
-    "SMALLINT": DataTypes.NUMBER,
-    "DATE": DataTypes.DATE,
-    "TIME": DataTypes.TIME,
-    "TIMESTAMP WITHOUT TIME ZONE": DataTypes.TIMESTAMP,
-    "TIMESTAMP WITH TIME ZONE": DataTypes.TIMESTAMP_WITH_TIMEZONE,
-    "TIME WITHOUT TIME ZONE": DataTypes.TIME,
+    "text": DataTypes.TEXT,
+    "varchar": DataTypes.TEXT,
+    "char": DataTypes.TEXT,
+    "boolean": DataTypes.BOOLEAN,
+    "numeric": DataTypes.NUMBER,
+    "decimal": DataTypes.NUMBER,
+    "real": DataTypes.NUMBER,
+    "double precision": DataTypes.NUMBER,
+    "integer": DataTypes.NUMBER,
+    "bigint": DataTypes.NUMBER,
+    "smallint": DataTypes.NUMBER,
+    "date": DataTypes.DATE,
+    "time": DataTypes.TIME,
+    "timestamp without time zone": DataTypes.TIMESTAMP,
+    "timestamp with time zone": DataTypes.TIMESTAMP_WITH_TIMEZONE,
+    "time without time zone": DataTypes.TIME,
 }
 
+# Inserts with at least this many rows are loaded with COPY instead of a per row executemany.
+_COPY_INSERT_MIN_ROWS = 1000
+
+# Pool settings; wide inserts produce long statements that should still stay in the cache.
+_STATEMENT_CACHE_SIZE = 1024
+_MAX_CACHEABLE_STATEMENT_SIZE = 64 * 1024
+_MAX_INACTIVE_CONNECTION_LIFETIME = 300
+_MIN_POOL_SIZE = 10
+_MAX_POOL_SIZE = 10
+
+# Rows fetched per round trip by `stream_query_results`.
+_STREAM_PREFETCH_ROWS = 1000
+
+# Column converters are cached for at most this many distinct type mappings.
+_CONVERTERS_CACHE_SIZE = 64
+
+
+# The binary jsonb wire format is this version byte followed by the JSON text.
+_JSONB_BINARY_FORMAT_VERSION = b"\x01"
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # Values converted by `DataTypes.JSON` are already JSON text and go over the wire unchanged.
+    if not isinstance(value, str):
+        value = DataTypes.JSON.validate_and_convert(value)
+    return _JSONB_BINARY_FORMAT_VERSION + value.encode("utf-8")
+
+
+def _decode_jsonb(data: bytes) -> str:
+    if data[:1] != _JSONB_BINARY_FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported jsonb format version: {data[:1]!r}")
+    return data[1:].decode("utf-8")
+
 
 class QueryHelper:
 
-    def __init__(self, connection_properties: ConnectionProperties):
+    def __init__(
+        self,
+        connection_properties: ConnectionProperties,
+        min_pool_size: int = _MIN_POOL_SIZE,
+        max_pool_size: int = _MAX_POOL_SIZE,
+    ):
+        # One helper, and so one pool per database, is meant to be shared by the whole process.
         self._connection_properties: ConnectionProperties = connection_properties
+        self._min_pool_size = min_pool_size
+        self._max_pool_size = max_pool_size
         self._db_pool: Optional[Dict[str, Pool]] = {}
+        self._db_pool_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._insert_query_cache: Dict[
+            Tuple[str, Tuple[str, ...], Tuple[str, ...]], str
+        ] = {}
+        self._converters_cache: Dict[
+            int, Tuple[Mapping[str, DataTypes], Dict[str, Callable[[Any], Any]]]
+        ] = {}
 
     async def _get_connection_pool(self, database_name: str) -> Pool:
-        if database_name not in self._db_pool:
-            self._db_pool[database_name] = await asyncpg.create_pool(
-                self._connection_properties.build_postgres_connection_url(database_name)
-            )
+        pool = self._db_pool.get(database_name)
+        if pool is not None:
+            return pool
+        # Concurrent first callers for a database would otherwise each create their own pool.
+        async with self._db_pool_locks[database_name]:
+            if database_name not in self._db_pool:
+                self._db_pool[database_name] = await asyncpg.create_pool(
+                    self._connection_properties.build_postgres_connection_url(
+                        database_name
+                    ),
+                    statement_cache_size=_STATEMENT_CACHE_SIZE,
+                    max_cacheable_statement_size=_MAX_CACHEABLE_STATEMENT_SIZE,
+                    max_inactive_connection_lifetime=_MAX_INACTIVE_CONNECTION_LIFETIME,
+                    min_size=self._min_pool_size,
+                    max_size=self._max_pool_size,
+                    init=QueryHelper._init_connection,
+                )
         return self._db_pool[database_name]
 
+    async def open_pool(self, database_name: str):
+        """
+        Creates the connection pool of a database up front, e.g. at application startup, so the
+        first query does not pay for opening the connections.
+
+        Parameters:
+        database_name (str): The database to open the pool for.
+        """
+        await self._get_connection_pool(database_name)
+
+    async def close(self):
+        """
+        Gracefully closes all connection pools opened by this helper.
+        """
+        pools = list(self._db_pool.values())
+        self._db_pool.clear()
+        await asyncio.gather(*(pool.close() for pool in pools))
+
+    @staticmethod
+    async def _init_connection(connection: asyncpg.Connection):
+        # Runs once per new pool connection, unlike `setup` which runs on every acquire.
+        # The codec has to be binary, as COPY (`copy_records_to_table`) only encodes binary.
+        await connection.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary",
+        )
+
     async def create_table(self, table_model: TableModel):
         query = QueryHelper.build_create_table_query(table_model)
         async with (
@@ -68,12 +161,7 @@ class QueryHelper:
 
         replace_part = "OR REPLACE" if replace else ""
         if_not_exists_part = "IF NOT EXISTS" if only_if_not_exists else ""
-        columns_part = ",".join(
-            [
-                f'"{c}" {d.value[0]}'
-                for c, d in table_model.column_name_to_data_type_map.items()
-            ]
-        )
+        columns_part = table_model.columns_ddl
         primary_keys = table_model.primary_keys
 
         primary_keys_part = ""
@@ -85,7 +173,8 @@ class QueryHelper:
 
     async def insert_dataframe(self, table_model: TableModel, df: pd.DataFrame):
         data_df = QueryHelper._process_df_for_table_insert(table_model, df)
-        values = list(data_df.itertuples(index=False, name=None))
+        # Zipping whole columns avoids itertuples' per row indexing into the frame.
+        values = list(zip(*(data_df[c].tolist() for c in data_df.columns)))
         await self._insert_tuples_into_table(table_model, { c: table_model.column_name_to_data_type_map[c] for c in data_df.columns }, values)
 
     async def insert_pydantic_models(
@@ -111,72 +200,161 @@ class QueryHelper:
         database_name: str,
         query: str,
         params: Optional[List[Any]] = None,
-        output_column_name_data_type_mapping: Optional[Dict[str, DataTypes]] = None,
+        output_column_name_data_type_mapping: Optional[Mapping[str, DataTypes]] = None,
     ) -> Optional[List[Dict[str, Any]]]:
 
-        async with (
-            await self._get_connection_pool(database_name=database_name)
-        ).acquire() as connection:
-            results = await connection.fetch(query, *params if params else [])
+        results = await self._fetch_records(database_name, query, params)
 
         if results is None:
             return None
 
-        processed_results = []
-        for row in results:
-            row_dict = dict(row)
-            processed_row_dict = {}
+        if output_column_name_data_type_mapping is None:
+            return [dict(row) for row in results]
 
-            if output_column_name_data_type_mapping is None:
-                processed_row_dict = row_dict
-            else:
-                for column_name, value in row_dict.items():
-                    if column_name in output_column_name_data_type_mapping:
-                        processed_row_dict[column_name] = (
-                            output_column_name_data_type_mapping[
-                                column_name
-                            ].validate_and_convert(value)
-                        )
-                    else:
-                        processed_row_dict[column_name] = value
-            processed_results.append(processed_row_dict)
-        return processed_results
+        converters = self._get_converters(output_column_name_data_type_mapping)
+        return [QueryHelper._convert_row(row, converters) for row in results]
 
-    async def get_query_results_as_dataframe(
+    async def stream_query_results(
         self,
         database_name: str,
         query: str,
         params: Optional[List[Any]] = None,
-        output_column_name_data_type_mapping: Optional[Dict[str, DataTypes]] = None,
-    ) -> Optional[pd.DataFrame]:
+        output_column_name_data_type_mapping: Optional[Mapping[str, DataTypes]] = None,
+        prefetch: int = _STREAM_PREFETCH_ROWS,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams the results of a query as dictionaries through a server side cursor, so rows can
+        be processed while the rest are still being transferred and only `prefetch` rows are held
+        in memory at a time.
+
+        Parameters:
+        database_name (str): The database to run the query against.
+        query (str): The query to run.
+        params (Optional[List[Any]]): The bind parameters of the query.
+        output_column_name_data_type_mapping (Optional[Dict[str, DataTypes]]): Data types to
+            convert the values of the given columns with.
+        prefetch (int): The number of rows fetched from the server per round trip.
+
+        Returns:
+        AsyncIterator[Dict[str, Any]]: The rows, keyed by column name.
+        """
+        converters = (
+            None
+            if output_column_name_data_type_mapping is None
+            else self._get_converters(output_column_name_data_type_mapping)
+        )
         async with (
             await self._get_connection_pool(database_name=database_name)
         ).acquire() as connection:
-            results = await connection.fetch(query, *params if params else [])
+            # Server side cursors only exist within a transaction.
+            async with connection.transaction():
+                async for row in connection.cursor(
+                    query, *params if params else [], prefetch=prefetch
+                ):
+                    yield (
+                        dict(row)
+                        if converters is None
+                        else QueryHelper._convert_row(row, converters)
+                    )
+
+    def _get_converters(
+        self, output_column_name_data_type_mapping: Mapping[str, DataTypes]
+    ) -> Dict[str, Callable[[Any], Any]]:
+        # Callers passing the same (constant) mapping object reuse its converters. The mapping is
+        # kept in the entry, so its id cannot be reused by another object while cached.
+        cache_key = id(output_column_name_data_type_mapping)
+        cached = self._converters_cache.get(cache_key)
+        if cached is not None and cached[0] is output_column_name_data_type_mapping:
+            return cached[1]
+        converters = QueryHelper._build_converters(output_column_name_data_type_mapping)
+        if len(self._converters_cache) >= _CONVERTERS_CACHE_SIZE:
+            self._converters_cache.clear()
+        self._converters_cache[cache_key] = (
+            output_column_name_data_type_mapping,
+            converters,
+        )
+        return converters
+
+    @staticmethod
+    def _build_converters(
+        output_column_name_data_type_mapping: Mapping[str, DataTypes]
+    ) -> Dict[str, Callable[[Any], Any]]:
+        # Resolve each column's converter once instead of per value.
+        return {
+            column_name: data_type.validate_and_convert
+            for column_name, data_type in output_column_name_data_type_mapping.items()
+        }
+
+    @staticmethod
+    def _convert_row(
+        row: asyncpg.Record, converters: Dict[str, Callable[[Any], Any]]
+    ) -> Dict[str, Any]:
+        return {
+            column_name: (
+                converters[column_name](value) if column_name in converters else value
+            )
+            for column_name, value in row.items()
+        }
+
+    async def get_query_results_as_dataframe(
+        self,
+        database_name: str,
+        query: str,
+        params: Optional[List[Any]] = None,
+        output_column_name_data_type_mapping: Optional[Dict[str, DataTypes]] = None,
+    ) -> Optional[pd.DataFrame]:
+        results = await self._fetch_records(database_name, query, params)
 
         if not results:
             return None
 
-        rows = [dict(row) for row in results]
+        # Transpose the records into columns so pandas doesn't need a dict per row.
+        columns = list(results[0].keys())
+        df = pd.DataFrame(dict(zip(columns, map(list, zip(*results)))))
 
         if not output_column_name_data_type_mapping:
-            return pd.DataFrame(rows)
+            return df
 
         pandas_dtype_mapping = {
             col: dtype.pandas_dtype
             for col, dtype in output_column_name_data_type_mapping.items()
         }
-        return pd.DataFrame(rows).astype(pandas_dtype_mapping)
+        return df.astype(pandas_dtype_mapping)
 
     async def discover_table(
         self, database_name: str, schema_name: str, table_name: str
     ) -> Optional[TableModel]:
-        column_name_to_data_type_map, primary_keys = await asyncio.gather(
-            self._get_column_name_data_type_mapping(
-                database_name, schema_name, table_name
-            ),
-            self._get_primary_keys(database_name, schema_name, table_name),
+        # Columns and primary keys are fetched in one round trip, told apart by `kind`.
+        table_metadata_query = """
+            SELECT 'column' AS kind, column_name, data_type, ordinal_position
+            FROM information_schema.columns
+            WHERE table_catalog = $1 AND table_schema = $2 AND table_name = $3
+            UNION ALL
+            SELECT 'primary_key' AS kind, kc.column_name, NULL, kc.ordinal_position
+            FROM information_schema.key_column_usage kc
+            JOIN information_schema.table_constraints tc 
+                ON kc.table_catalog = tc.table_catalog
+                AND kc.table_schema = tc.table_schema
+                AND kc.table_name = tc.table_name
+                AND kc.constraint_name = tc.constraint_name
+            WHERE tc.constraint_type = 'PRIMARY KEY'
+                AND kc.table_catalog = $1
+                AND kc.table_schema = $2
+                AND kc.table_name = $3
+            ORDER BY kind, ordinal_position ASC
+        """
+        # The catalog values are already strings, so the records are used without conversion.
+        results = await self._fetch_records(
+            database_name,
+            table_metadata_query,
+            [database_name, schema_name, table_name],
+        )
+        column_rows = [row for row in results if row["kind"] == "column"]
+        primary_key_rows = [row for row in results if row["kind"] == "primary_key"]
+        column_name_to_data_type_map = QueryHelper._build_column_name_data_type_mapping(
+            column_rows
         )
+        primary_keys = QueryHelper._build_primary_keys(primary_key_rows)
 
         return TableModel(
             database=database_name,
@@ -252,11 +430,88 @@ class QueryHelper:
         self, table_model: TableModel, column_data_type_map: Dict[str, DataTypes], values: List[Tuple[Any, ...]]
     ):
         columns = list(column_data_type_map.keys())
+        query = self._get_insert_query(table_model, column_data_type_map)
+        async with (
+            await self._get_connection_pool(database_name=table_model.database)
+        ).acquire() as connection:
+            async with connection.transaction():
+                if len(values) >= _COPY_INSERT_MIN_ROWS:
+                    await QueryHelper._copy_tuples_into_table(
+                        connection, table_model, columns, values
+                    )
+                    return
+                _LOG.info(f"Going to insert data into {table_model} with query: {query}. Values: {values}")
+                await connection.executemany(query, values)
+
+    def _get_insert_query(
+        self, table_model: TableModel, column_data_type_map: Dict[str, DataTypes]
+    ) -> str:
+        # Identical SQL text also lets asyncpg reuse its cached prepared statement. The text only
+        # depends on the columns, not their data types, as no casts are needed.
+        cache_key = (
+            table_model.get_fqn(),
+            tuple(column_data_type_map),
+            tuple(coalesce(table_model.primary_keys, [])),
+        )
+        query = self._insert_query_cache.get(cache_key)
+        if query is None:
+            columns = list(column_data_type_map.keys())
+            column_names_part = ", ".join([f'"{c}"' for c in columns])
+            # The jsonb codec registered on every connection makes a `::jsonb` cast unnecessary.
+            placeholders_part = ", ".join([f"${i + 1}" for i in range(len(columns))])
+            query = f"""
+INSERT INTO {table_model.get_fqn()} ({column_names_part}) 
+VALUES ({placeholders_part}) 
+{QueryHelper._build_conflict_part(table_model, columns)}
+"""
+            self._insert_query_cache[cache_key] = query
+        return query
+
+    @staticmethod
+    async def _copy_tuples_into_table(
+        connection: asyncpg.Connection,
+        table_model: TableModel,
+        columns: List[str],
+        values: List[Tuple[Any, ...]],
+    ):
+        if not table_model.primary_keys:
+            _LOG.info(f"Going to copy {len(values)} rows into {table_model}")
+            await connection.copy_records_to_table(
+                table_model.table,
+                records=values,
+                columns=columns,
+                schema_name=table_model.schema,
+            )
+            return
+
+        # COPY can't upsert, so the rows are staged in a temporary table and merged from there.
+        # A single INSERT can't update the same row twice, so only the last row per key is kept,
+        # matching what the per row upserts would have left behind.
+        primary_key_indexes = [columns.index(pk) for pk in table_model.primary_keys]
+        records = list(
+            {tuple(v[i] for i in primary_key_indexes): v for v in values}.values()
+        )
+        staging_table = f"_staging_{table_model.table}"
         column_names_part = ", ".join([f'"{c}"' for c in columns])
-        placeholders_part = ", ".join([
-            QueryHelper._build_placeholder(i, column_data_type_map[c])
-            for i, c in enumerate(columns)
-        ])
+        _LOG.info(f"Going to copy {len(records)} rows into {table_model} through {staging_table}")
+        await connection.execute(
+            f"""CREATE TEMPORARY TABLE "{staging_table}" ON COMMIT DROP AS SELECT {column_names_part} FROM {table_model.get_fqn()} WITH NO DATA"""
+        )
+        await connection.copy_records_to_table(
+            staging_table, records=records, columns=columns
+        )
+        await connection.execute(
+            f"""
+INSERT INTO {table_model.get_fqn()} ({column_names_part}) 
+SELECT {column_names_part} FROM "{staging_table}" 
+{QueryHelper._build_conflict_part(table_model, columns)}
+"""
+        )
+
+    @staticmethod
+    def _build_conflict_part(table_model: TableModel, columns: List[str]) -> str:
+        if not table_model.primary_keys:
+            return ""
         conflict_part = ", ".join([f'"{pk}"' for pk in table_model.primary_keys])
         update_part = ", ".join(
             [
@@ -265,23 +520,8 @@ class QueryHelper:
                 if c not in table_model.primary_keys
             ]
         )
-        query = f"""
-INSERT INTO {table_model.get_fqn()} ({column_names_part}) 
-VALUES ({placeholders_part}) 
-ON CONFLICT ({conflict_part}) 
-DO UPDATE SET {update_part}
-"""
-        async with (
-            await self._get_connection_pool(database_name=table_model.database)
-        ).acquire() as connection:
-            async with connection.transaction():
-                _LOG.info(f"Going to insert data into {table_model.model_dump()} with query: {query}. Values: {values}")
-                await connection.executemany(query, values)
-
-    @staticmethod
-    def _build_placeholder(index: int, data_type: DataTypes) -> str:
-        casting_part = "" if data_type != DataTypes.JSON else "::jsonb"
-        return f"${index+1}{casting_part}"
+        return f"""ON CONFLICT ({conflict_part}) 
+DO UPDATE SET {update_part}"""
 
     @staticmethod
     def _process_df_for_table_insert(
@@ -291,16 +531,13 @@ DO UPDATE SET {update_part}
         common_columns = QueryHelper._validate_data_and_get_columns_for_insert(
             table_model, df.columns
         )
-        data_df = df[[*common_columns]].astype("object")
-        data_df = data_df.map(lambda x: None if pd.isna(x) else x)
+        data_df = pd.DataFrame(index=df.index)
 
         for column in common_columns:
             data_type = table_model.column_name_to_data_type_map.get(column)
             if data_type is None:
                 raise RuntimeError(f"Unable to identify data type for column {column}.")
-            data_df[column] = data_df[column].map(
-                lambda v: data_type.validate_and_convert(v)
-            )
+            data_df[column] = data_type.convert_series(df[column])
 
         return data_df
 
@@ -308,45 +545,33 @@ DO UPDATE SET {update_part}
     def _validate_data_and_get_columns_for_insert(
         table_model: TableModel, columns: List[str]
     ):
-        common_columns = set(columns).intersection(
-            table_model.column_name_to_data_type_map.keys()
-        )
+        common_columns = table_model.column_name_to_data_type_map.keys() & columns
         if len(common_columns) == 0:
             raise RuntimeError(f"No columns common between Data and table.")
         if table_model.primary_keys is not None:
-            primary_key_columns_present = common_columns.intersection(
-                set(table_model.primary_keys)
-            )
-            primary_key_columns_absent = set(table_model.primary_keys).difference(
-                primary_key_columns_present
-            )
+            primary_key_columns_absent = table_model.primary_keys_set - common_columns
             if len(primary_key_columns_absent) > 0:
                 raise RuntimeError(
-                    f"Data is missing primary key columns: {primary_key_columns_absent}"
+                    f"Data is missing primary key columns: {set(primary_key_columns_absent)}"
                 )
         return common_columns
 
-    async def _get_column_name_data_type_mapping(
-        self, database_name: str, schema_name: str, table_name: str
+    async def _fetch_records(
+        self, database_name: str, query: str, params: Optional[List[Any]] = None
+    ) -> List[asyncpg.Record]:
+        async with (
+            await self._get_connection_pool(database_name=database_name)
+        ).acquire() as connection:
+            return await connection.fetch(query, *params if params else [])
+
+    @staticmethod
+    def _build_column_name_data_type_mapping(
+        rows: List[asyncpg.Record]
     ) -> Dict[str, DataTypes]:
-        column_query = """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_catalog = $1 AND table_schema = $2 AND table_name = $3;
-        """
-        results = await self.get_query_results_as_dictionaries(
-            database_name=database_name,
-            query=column_query,
-            params=[database_name, schema_name, table_name],
-            output_column_name_data_type_mapping={
-                "column_name": DataTypes.TEXT,
-                "data_type": DataTypes.TEXT,
-            },
-        )
         column_name_to_data_type_map = {}
-        for row in results:
+        for row in rows:
             column_name = row["column_name"]
-            postgres_data_type = row["data_type"].upper()
+            postgres_data_type = row["data_type"]
             mapped_data_type = _POSTGRES_TYPE_TO_ENUM.get(postgres_data_type)
 
             if mapped_data_type is not None:
@@ -357,38 +582,13 @@ DO UPDATE SET {update_part}
                 )
         return column_name_to_data_type_map
 
-    async def _get_primary_keys(
-        self, database_name: str, schema_name: str, table_name: str
-    ) -> Optional[List[str]]:
-        primary_keys_query = """
-                    SELECT kc.column_name
-                    FROM information_schema.key_column_usage kc
-                    JOIN information_schema.table_constraints tc 
-                        ON kc.table_catalog = tc.table_catalog
-                        AND kc.table_schema = tc.table_schema
-                        AND kc.table_name = tc.table_name
-                        AND kc.constraint_name = tc.constraint_name
-                    WHERE tc.constraint_type = 'PRIMARY KEY'
-                        AND kc.table_catalog = $1
-                        AND kc.table_schema = $2
-                        AND kc.table_name = $3
-                    ORDER BY kc.column_name ASC
-                """
-        results = await self.get_query_results_as_dictionaries(
-            database_name=database_name,
-            query=primary_keys_query,
-            params=[database_name, schema_name, table_name],
-            output_column_name_data_type_mapping={"column_name": DataTypes.TEXT},
-        )
-
-        pkeys = [v for v in {row["column_name"] for row in coalesce(results, set())}]
+    @staticmethod
+    def _build_primary_keys(rows: List[asyncpg.Record]) -> Optional[List[str]]:
+        # A table has a single primary key constraint, so the rows hold no duplicates and
+        # keep the constraint's column order from the query.
+        pkeys = [row["column_name"] for row in rows or []]
 
         if len(pkeys) == 0:
             return None
         else:
             return pkeys
-
-    async def close(self):
-        for pool in self._db_pool.values():
-            await pool.close()
-        self._db_pool.clear()
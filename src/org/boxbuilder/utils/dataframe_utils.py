@@ -36,27 +36,30 @@ def build_hash_column(
     1     2    b  0a0f9a4deff7e0ecf32b8b89f0cd06352f804b1a1a7775c9f0c567e777b20b2a
 
     """
-    df[hash_column_name] = df.apply(
-        lambda row: _hash_row(
-            row=row,
-            include_columns=include_columns,
-            value_to_str_converter=value_to_str_converter,
-        ),
-        axis=1,
-    )
-
-
-def _hash_row(
-    row: pd.Series,
-    value_to_str_converter: Callable[[Any], str],
-    include_columns: Optional[List[str]],
-) -> str:
-    row_str = "|".join(
-        [
-            value_to_str_converter(v)
-            for k, v in row.items()
-            if (include_columns is not None and k in include_columns)
-            or include_columns is None
+    columns = [
+        c for c in df.columns if include_columns is None or c in include_columns
+    ]
+    if len(columns) == 0 or len(df) == 0:
+        row_strs = pd.Series("", index=df.index, dtype="object")
+    else:
+        # Hashes were computed from `df.apply(axis=1)` rows, which hold the values of all the
+        # columns cast to their common dtype (an int next to a float column is stringified as
+        # "1.0"). Each column is cast to that dtype, and iterated like a row, to keep them.
+        row_dtype = df.iloc[0].dtype
+        # Convert column-wise so each value is stringified without building a Series per row.
+        str_columns = [
+            pd.Series(
+                [value_to_str_converter(v) for v in df[c].astype(row_dtype)],
+                index=df.index,
+                dtype="object",
+            )
+            for c in columns
         ]
+        row_strs = str_columns[0].str.cat(str_columns[1:], sep="|")
+
+    # Encode in one vectorized pass so the loop below only feeds bytes to hashlib.
+    row_bytes = row_strs.str.encode("utf-8").to_numpy()
+    sha256 = hashlib.sha256
+    df[hash_column_name] = pd.Series(
+        [sha256(b).hexdigest() for b in row_bytes], index=df.index, dtype="object"
     )
-    return hashlib.sha256(row_str.encode()).hexdigest()
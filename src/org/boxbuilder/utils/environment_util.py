@@ -9,13 +9,17 @@ Raises:
 
 Functions:
     get_content_root() -> Path:
-        Retrieves the content root directory from the environment variable.
+        Retrieves the resolved content root directory from the environment variable.
 
     get_environment() -> Environments:
         Retrieves the runtime environment from the environment variable
         and returns it as an `Environments` enum.
+
+    invalidate_env_cache():
+        Clears the cached values so the environment variables are read again.
 """
 
+import functools
 import os
 from pathlib import Path
 
@@ -25,15 +29,17 @@ CONTENT_ROOT_ENV_KEY = "CONTENT_ROOT"
 RUNTIME_ENVIRONMENT_ENV_KEY = "RUNTIME_ENVIRONMENT"
 
 
+@functools.lru_cache(maxsize=1)
 def get_content_root() -> Path:
     """
     Retrieves the content root directory from an environment variable.
 
     The function reads the value of the environment variable defined by `_CONTENT_ROOT_KEY`
-    and returns it as a `Path` object.
+    and returns it as an absolute `Path` object with symlinks resolved. The value is cached after
+    the first successful call, so every call returns the same `Path` instance.
 
     Returns:
-        Path: The content root directory.
+        Path: The absolute, resolved content root directory.
 
     Raises:
         RuntimeError: If the environment variable is not set.
@@ -43,15 +49,17 @@ def get_content_root() -> Path:
         raise RuntimeError(
             f"Expecting {CONTENT_ROOT_ENV_KEY} environment variable to be configured."
         )
-    return Path(cr)
+    return Path(cr).resolve()
 
 
+@functools.lru_cache(maxsize=1)
 def get_environment() -> Environments:
     """
     Retrieves the runtime environment from an environment variable.
 
     The function reads the value of the environment variable defined by `_RUNTIME_ENVIRONMENT_KEY`
-    and returns the corresponding `Environments` enum.
+    and returns the corresponding `Environments` enum. The value is cached after the first
+    successful call.
 
     Returns:
         Environments: The runtime environment as an `Environments` enum.
@@ -61,3 +69,12 @@ def get_environment() -> Environments:
     """
     er = os.getenv(RUNTIME_ENVIRONMENT_ENV_KEY)
     return Environments[er]
+
+
+def invalidate_env_cache():
+    """
+    Clears the values cached by `get_content_root()` and `get_environment()`, e.g. after a
+    test changes the environment variables.
+    """
+    get_content_root.cache_clear()
+    get_environment.cache_clear()
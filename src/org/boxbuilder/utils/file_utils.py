@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 
 
 def get_all_files_in_dir(input_dir: Path) -> List[Path]:
@@ -30,10 +30,63 @@ def get_all_files_in_dir(input_dir: Path) -> List[Path]:
     ------
     - Hidden files (e.g., `.gitignore`) are included in the list.
     - Subdirectories are ignored; only regular files are returned.
+    - Use `iter_files` to stream the paths instead of holding them all in memory.
     """
-    output = []
-    for fp in os.listdir(input_dir):
-        full_path = input_dir / fp
-        if full_path.is_file():
-            output.append(full_path)
-    return output
+    return list(iter_files(input_dir))
+
+
+def iter_files(input_dir: Path) -> Iterator[Path]:
+    """
+    Lazily iterate over the paths of all files in a given directory.
+
+    Unlike `get_all_files_in_dir`, the paths are produced as the directory is read, so memory
+    use does not grow with the number of entries. Wrap the call in `sorted(...)` when an
+    ordering is needed.
+
+    Parameters:
+    -----------
+    input_dir : Path
+        The directory whose files need to be listed.
+
+    Returns:
+    --------
+    Iterator[Path]
+        The full paths of all files in the directory.
+
+    Notes:
+    ------
+    - The underlying directory handle is closed once the iterator is exhausted or garbage
+      collected.
+    """
+    for entry in iter_file_entries(input_dir):
+        yield Path(entry.path)
+
+
+def iter_file_entries(input_dir: Path) -> Iterator[os.DirEntry]:
+    """
+    Iterate over the regular files in a given directory as `os.DirEntry` objects.
+
+    The entries carry the file type (and, once fetched, the stat result) read while listing
+    the directory, so callers can use `entry.is_file()` or `entry.stat()` without another
+    `stat()` system call per file.
+
+    Parameters:
+    -----------
+    input_dir : Path
+        The directory whose files need to be listed.
+
+    Returns:
+    --------
+    Iterator[os.DirEntry]
+        The directory entries of all files in the directory.
+
+    Example:
+    --------
+    >>> from pathlib import Path
+    >>> [entry.name for entry in iter_file_entries(Path("/some/directory"))]
+    ['file1.txt', 'file2.csv']
+    """
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry
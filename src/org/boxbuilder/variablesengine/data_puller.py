@@ -1,23 +1,106 @@
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, FrozenSet, List, Set, Any, Optional, Tuple
+import asyncio
+import functools
+import json
 import logging
+import sys
+import weakref
 from dataclasses import dataclass
-from collections import defaultdict
+from operator import itemgetter
+from types import MappingProxyType
 
 from org.boxbuilder.variablesengine.models.project import Project
 from org.boxbuilder.variablesengine.models.variable import Variable
+from org.boxbuilder.database.postgres.models.data_types import DataTypes
 from org.boxbuilder.database.postgres.query_helper import QueryHelper
 
 logger = logging.getLogger(__name__)
 
+# Fetches the values of the required (entity, variable) pairs, passed as parallel arrays, limited
+# to one entity instance where an instance id is given (NULL means all instances). pull_data keeps
+# one value per pair, so a pair matching several instances gets the value of the highest instance
+# id, picked in the database so the same call always returns the same value.
+_VARIABLE_VALUES_QUERY = """
+SELECT DISTINCT ON (r.entity_name, v.name)
+    r.entity_name,
+    vv.entity_instance_id,
+    v.name as variable_name,
+    vv.value
+FROM unnest($1::text[], $2::text[], $3::text[], $4::text[])
+    AS r(entity_name, entity_id, variable_name, entity_instance_id)
+JOIN variables_engine.variables v ON v.entity_id = r.entity_id AND v.name = r.variable_name
+JOIN variables_engine.variable_values vv ON vv.variable_id = v.id
+    AND (r.entity_instance_id IS NULL OR vv.entity_instance_id = r.entity_instance_id)
+ORDER BY r.entity_name, v.name, vv.entity_instance_id DESC
+"""
+
+# Column types of the query results; the same object is passed on every call so the query
+# helper can reuse the converters it builds for it. The jsonb values arrive as JSON text and are
+# decoded by `_fold_row` instead, as `DataTypes.JSON` only validates text.
+_VARIABLE_VALUES_COLUMN_TYPES = MappingProxyType({
+    "entity_name": DataTypes.TEXT,
+    "entity_instance_id": DataTypes.TEXT,
+    "variable_name": DataTypes.TEXT
+})
+
+# Extracts the fields pull_data needs from a result row in one call
+_ROW_FIELDS = itemgetter('entity_name', 'variable_name', 'value')
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _fold_row(row: Dict[str, Any], fetched_values: Dict[str, Dict[str, Any]]):
+    """Store the decoded value of a result row in the per-entity dicts."""
+    entity_name, var_name, value = _ROW_FIELDS(row)
+    if value is not None:
+        value = _JSON_DECODER.decode(value)
+    # The entity names come from the bound parameters, so each has a bucket. Names are interned
+    # like the project's, so the engine's lookups by these keys compare by identity.
+    fetched_values[sys.intern(entity_name)][sys.intern(var_name)] = value
+
 @dataclass
 class VariableDependency:
     variable: Variable
-    dependencies: Set[str]  # Set of variable names this variable depends on
+    dependencies: FrozenSet[str]  # Set of variable names this variable depends on
     foreign_keys: Dict[str, str]  # Map of variable name to referenced entity name
 
+@dataclass
+class _PendingRead:
+    required_vars: Dict[str, Set[str]]  # Union of the variables required by the waiting calls
+    input_filters: Dict[str, Dict[str, str]]  # Entity instance ids shared by the waiting calls
+    future: asyncio.Future  # Resolves to the fetched values, keyed by entity and variable name
+    callers: int = 0
+
 class DataPuller:
-    def __init__(self, query_helper: QueryHelper):
+    def __init__(
+        self,
+        query_helper: QueryHelper,
+        coalesce_window_seconds: float = 0.0,
+        concurrent_entity_queries: bool = False
+    ):
+        """
+        Args:
+            query_helper: Helper used to query the variables_engine database
+            coalesce_window_seconds: How long the first of several concurrent pull_data calls for a
+                project waits for the others before one query is issued for all of them. With the
+                default of 0, only calls made within the same event loop iteration are combined.
+            concurrent_entity_queries: Fetch each entity's variables with its own query, run
+                concurrently on separate pooled connections, instead of one query for all entities.
+                Latency then follows the slowest entity rather than the whole combined query.
+        """
         self.query_helper = query_helper
+        self.coalesce_window_seconds = coalesce_window_seconds
+        self.concurrent_entity_queries = concurrent_entity_queries
+        # Dependency graphs keyed by project id, with a weak reference to the project instance they
+        # were built from; an entry is dropped once that project is garbage collected
+        self._dependency_graphs: Dict[
+            str, Tuple[weakref.ref, Dict[str, VariableDependency]]
+        ] = {}
+        # The next query of each project and set of entity instance ids, shared by the calls waiting for it
+        self._pending_reads: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _PendingRead] = {}
+        # The query already running for each project and set of entity instance ids
+        self._running_reads: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _PendingRead] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
         
     def build_dependency_graph(self, project: Project) -> Dict[str, VariableDependency]:
         """Build a graph of variable dependencies including foreign key relationships."""
@@ -25,20 +108,45 @@ class DataPuller:
         
         # First pass: collect all variables and their direct dependencies
         for variable in project.variables:
-            dependencies = set(variable.input_variables)
             foreign_keys = {}
             
-            # Check for foreign key relationships in metadata
-            if variable.metadata.get('foreign_key'):
-                foreign_keys[variable.name] = variable.metadata['foreign_key']['entity']
+            # Check for foreign key relationships, precomputed from the metadata
+            if variable.foreign_key_entity:
+                foreign_keys[variable.name] = variable.foreign_key_entity
             
             graph[variable.name] = VariableDependency(
                 variable=variable,
-                dependencies=dependencies,
+                dependencies=variable.dependencies,
                 foreign_keys=foreign_keys
             )
             
         return graph
+
+    def invalidate_dependency_graph(self, project_id: Optional[str] = None):
+        """Drop the cached dependency graph of a project, or of all projects if no id is given."""
+        if project_id is None:
+            self._dependency_graphs.clear()
+        else:
+            self._dependency_graphs.pop(project_id, None)
+
+    def _get_dependency_graph(self, project: Project) -> Dict[str, VariableDependency]:
+        """Return the cached dependency graph of the project, building it on first use."""
+        graphs = self._dependency_graphs
+        project_id = project.id
+        cached = graphs.get(project_id)
+        # A different instance with the same id (e.g. a reloaded project) gets a fresh graph
+        if cached is not None and cached[0]() is project:
+            return cached[1]
+        
+        def drop_graph(project_ref: weakref.ref):
+            # Only drop the entry if it was not replaced by a newer instance's graph
+            entry = graphs.get(project_id)
+            if entry is not None and entry[0] is project_ref:
+                del graphs[project_id]
+        
+        graph = self.build_dependency_graph(project)
+        graphs[project_id] = (weakref.ref(project, drop_graph), graph)
+        return graph
     
     def get_required_variables(
         self,
@@ -50,37 +158,60 @@ class DataPuller:
         Determine all variables needed to calculate the requested outputs.
         Returns a dict mapping entity names to sets of required variable names.
         """
-        graph = self.build_dependency_graph(project)
-        required_vars = defaultdict(set)
+        graph = self._get_dependency_graph(project)
+        # Preallocated for the project's entities; unknown names from the request are still kept
+        required_vars = {entity_name: set() for entity_name in project.entities_by_name}
         
         # Add all requested output variables
         for entity_name, var_names in requested_outputs.items():
-            required_vars[entity_name].update(var_names)
+            required_vars.setdefault(entity_name, set()).update(var_names)
         
         # Add all provided input variables
         for entity_name, inputs in provided_inputs.items():
-            required_vars[entity_name].update(inputs.keys())
-        
-        # Process each entity's required variables
-        for entity_name, var_names in list(required_vars.items()):
-            to_process = set(var_names)
-            while to_process:
-                var_name = to_process.pop()
-                if var_name not in graph:
+            required_vars.setdefault(entity_name, set()).update(inputs.keys())
+        
+        # Depth-first walk over (entity, variable) pairs, using a plain list as the stack; each
+        # pair is expanded once, including the ids of entities pulled in by foreign keys
+        to_visit = [
+            (entity_name, var_name)
+            for entity_name, var_names in required_vars.items()
+            for var_name in var_names
+        ]
+        visited = set(to_visit)
+        variables_by_entity_name = project.variables_by_entity_name
+        while to_visit:
+            entity_name, var_name = to_visit.pop()
+            # Prefer the entity's own variable, so names shared by several entities do not collide
+            variable = variables_by_entity_name.get(entity_name, {}).get(var_name)
+            if variable is not None:
+                dependencies = variable.dependencies
+                foreign_key_entity = variable.foreign_key_entity
+                ref_entities = (foreign_key_entity,) if foreign_key_entity else ()
+            else:
+                dependency = graph.get(var_name)
+                if dependency is None:
                     continue
-                    
-                # Add dependencies
-                deps = graph[var_name].dependencies
-                to_process.update(deps - required_vars[entity_name])
-                required_vars[entity_name].update(deps)
-                
-                # Add foreign key referenced variables
-                for fk_var, ref_entity in graph[var_name].foreign_keys.items():
-                    if fk_var in required_vars[entity_name]:
-                        # Add the referenced entity's ID variable
-                        required_vars[ref_entity].add('id')
-        
-        return dict(required_vars)
+                dependencies = dependency.dependencies
+                ref_entities = dependency.foreign_keys.values()
+            
+            # Add dependencies
+            entity_vars = required_vars[entity_name]
+            for dep in dependencies:
+                pair = (entity_name, dep)
+                if pair not in visited:
+                    visited.add(pair)
+                    entity_vars.add(dep)
+                    to_visit.append(pair)
+            
+            # Add foreign key referenced entities' ID variables
+            for ref_entity in ref_entities:
+                pair = (ref_entity, 'id')
+                if pair not in visited:
+                    visited.add(pair)
+                    required_vars.setdefault(ref_entity, set()).add('id')
+                    to_visit.append(pair)
+        
+        return {entity_name: var_names for entity_name, var_names in required_vars.items() if var_names}
     
     async def pull_data(
         self,
@@ -93,86 +224,207 @@ class DataPuller:
         Returns a dict mapping entity names to dicts of variable values.
         """
         required_vars = self.get_required_variables(project, requested_outputs, provided_inputs)
-        
-        # Build a single optimal query
-        query = self._build_optimal_query(project, required_vars, provided_inputs)
+        # A provided 'id' input pins its entity to that instance
+        input_filters = {
+            entity_name: {'id': str(inputs['id'])}
+            for entity_name, inputs in provided_inputs.items()
+            if inputs.get('id') is not None
+        }
         
         try:
-            # Execute query
-            query_results = await self.query_helper.get_query_results_as_dictionaries(
-                database_name="variables_engine",
-                query=query,
-                params=[],
-                output_column_name_data_type_mapping={
-                    "entity_name": "TEXT",
-                    "entity_instance_id": "TEXT",
-                    "variable_name": "TEXT",
-                    "value": "JSON"
-                }
+            # Execute query, shared with concurrent calls for the same project and instances
+            fetched_values, shared = await self._fetch_variable_values(
+                project, required_vars, input_filters
             )
             
-            # Process results
-            results = defaultdict(dict)
-            for row in query_results:
-                entity_name = row['entity_name']
-                var_name = row['variable_name']
-                if var_name in required_vars[entity_name]:  # Only include requested variables
-                    results[entity_name][var_name] = row['value']
+            # The query is scoped to the requested (entity, variable) pairs, so the values only
+            # need filtering when other callers' variables were fetched along with them
+            if not shared:
+                return {entity_name: values for entity_name, values in fetched_values.items() if values}
+            
+            results = {}
+            for entity_name, var_names in required_vars.items():
+                entity_values = fetched_values.get(entity_name)
+                if not entity_values:
+                    continue
+                requested_values = {
+                    var_name: entity_values[var_name]
+                    for var_name in var_names
+                    if var_name in entity_values
+                }
+                if requested_values:
+                    results[entity_name] = requested_values
             
-            return dict(results)
+            return results
             
         except Exception as e:
             logger.error(f"Error pulling data: {str(e)}")
             return {}
     
+    async def _fetch_variable_values(
+        self,
+        project: Project,
+        required_vars: Dict[str, Set[str]],
+        input_filters: Dict[str, Dict[str, str]]
+    ) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """
+        Fetch the values of the required variables, keyed by entity and variable name. Concurrent
+        calls for the same project and entity instances join the pending read, so one query
+        fetches the union of their variables. Calls whose variables are all fetched by the query
+        already running for those instances wait for its result instead of issuing another. Also
+        returns whether the read was shared with other calls.
+        """
+        if not required_vars:
+            return {}, False
+        
+        read_key = (
+            project.id,
+            tuple(sorted((entity_name, f['id']) for entity_name, f in input_filters.items()))
+        )
+        running = self._running_reads.get(read_key)
+        if running is not None and all(
+            var_names <= running.required_vars.get(entity_name, frozenset())
+            for entity_name, var_names in required_vars.items()
+        ):
+            running.callers += 1
+            return await asyncio.shield(running.future), True
+        
+        pending = self._pending_reads.get(read_key)
+        if pending is None:
+            pending = _PendingRead(
+                required_vars={},
+                input_filters=input_filters,
+                future=asyncio.get_running_loop().create_future()
+            )
+            self._pending_reads[read_key] = pending
+            task = asyncio.create_task(self._flush_pending_read(project, read_key))
+            self._flush_tasks.add(task)
+            task.add_done_callback(functools.partial(self._finish_flush, read_key, pending))
+        
+        pending.callers += 1
+        for entity_name, var_names in required_vars.items():
+            pending.required_vars.setdefault(entity_name, set()).update(var_names)
+        # A cancelled caller must not cancel the read shared with the others
+        fetched_values = await asyncio.shield(pending.future)
+        return fetched_values, pending.callers > 1
+    
+    async def _flush_pending_read(
+        self,
+        project: Project,
+        read_key: Tuple[str, Tuple[Tuple[str, str], ...]]
+    ):
+        """Wait for the coalescing window, then run one query for all pending callers of the read."""
+        await asyncio.sleep(self.coalesce_window_seconds)
+        pending = self._pending_reads.pop(read_key)
+        self._running_reads[read_key] = pending
+        required_vars, input_filters = pending.required_vars, pending.input_filters
+        future = pending.future
+        
+        # Rows are folded into per-entity dicts as they stream in, so only the values are kept
+        fetched_values = {entity_name: {} for entity_name in required_vars}
+        try:
+            if self.concurrent_entity_queries and len(required_vars) > 1:
+                # One query per entity, each on its own pooled connection; a failure cancels the rest
+                async with asyncio.TaskGroup() as task_group:
+                    for entity_name, var_names in required_vars.items():
+                        task_group.create_task(
+                            self._fetch_values_into(
+                                project, {entity_name: var_names}, input_filters, fetched_values
+                            )
+                        )
+            else:
+                await self._fetch_values_into(project, required_vars, input_filters, fetched_values)
+        except Exception as e:
+            if isinstance(e, ExceptionGroup):
+                e = e.exceptions[0]
+            future.set_exception(e)
+        else:
+            future.set_result(fetched_values)
+    
+    def _finish_flush(
+        self,
+        read_key: Tuple[str, Tuple[Tuple[str, str], ...]],
+        pending: _PendingRead,
+        task: asyncio.Task
+    ):
+        """Clean up after a flush task is done, however it ended."""
+        self._flush_tasks.discard(task)
+        # A flush cancelled while waiting or querying, or even before it started, never resolves
+        # the read, so its callers are cancelled too instead of waiting forever
+        pending.future.cancel()
+        # Later calls start a read of their own; a newer read for the same instances may already
+        # have started meanwhile
+        if self._pending_reads.get(read_key) is pending:
+            del self._pending_reads[read_key]
+        if self._running_reads.get(read_key) is pending:
+            del self._running_reads[read_key]
+    
+    async def _fetch_values_into(
+        self,
+        project: Project,
+        required_vars: Dict[str, Set[str]],
+        input_filters: Dict[str, Dict[str, str]],
+        fetched_values: Dict[str, Dict[str, Any]]
+    ):
+        """Query the values of the required variables and fold them into the per-entity dicts."""
+        # Build a single optimal query
+        query, params = self._build_optimal_query(project, required_vars, input_filters)
+        if not params[0]:
+            # None of the entities is in the project, so there is nothing to query
+            return
+        
+        # With every entity pinned to an instance there is at most a row per required variable,
+        # too few to pay for the transaction and cursor round trips of a stream
+        if all(entity_name in input_filters for entity_name in required_vars):
+            rows = await self.query_helper.get_query_results_as_dictionaries(
+                database_name="variables_engine",
+                query=query,
+                params=params,
+                output_column_name_data_type_mapping=_VARIABLE_VALUES_COLUMN_TYPES
+            )
+            for row in rows or []:
+                _fold_row(row, fetched_values)
+            return
+        
+        rows = self.query_helper.stream_query_results(
+            database_name="variables_engine",
+            query=query,
+            params=params,
+            output_column_name_data_type_mapping=_VARIABLE_VALUES_COLUMN_TYPES
+        )
+        async for row in rows:
+            _fold_row(row, fetched_values)
+    
     def _build_optimal_query(
         self,
         project: Project,
         required_vars: Dict[str, Set[str]],
         input_filters: Dict[str, Dict[str, Any]]
-    ) -> str:
-        """Build a single optimal SQL query to fetch all required data. Only use dependency resolution and input variables."""
-        # Start with base query using a CTE for each entity
-        entity_ctes = []
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build a single optimal SQL query to fetch all required data. Only use dependency resolution and input variables.
+        Returns the query and its bind parameters. The SQL text is constant; the required
+        (entity, variable) pairs are bound as parallel arrays, so the database plans one join
+        for all entities and can reuse that plan across calls. An entity with an 'id' input filter
+        only gets the values of that instance, the others get one row per variable (see
+        `_VARIABLE_VALUES_QUERY`).
+        """
+        entity_names = []
+        entity_ids = []
+        variable_names = []
+        instance_ids = []
         
         for entity_name, var_names in required_vars.items():
-            entity = next((e for e in project.entities if e.name == entity_name), None)
+            entity = project.entities_by_name.get(entity_name)
             if not entity:
                 continue
-                
-            # Build CTE for this entity
-            cte_name = f"{entity_name.lower()}_data"
-            entity_ctes.append(f"""
-            {cte_name} AS (
-                SELECT 
-                    '{entity_name}' as entity_name,
-                    vv.entity_instance_id,
-                    v.name as variable_name,
-                    vv.value
-                FROM variables_engine.variable_values vv
-                JOIN variables_engine.variables v ON v.id = vv.variable_id
-                WHERE v.entity_id = '{entity.id}'
-                AND v.name IN ({', '.join(f"'{name}'" for name in var_names)})
-            )""")
-        
-        # Combine all CTEs
-        query = "WITH " + ",\n".join(entity_ctes)
-        
-        # Add final SELECT that combines all entity data
-        query += """
-        SELECT * FROM (
-        """
-        
-        # UNION ALL all entity CTEs
-        query += "\nUNION ALL\n".join(
-            f"SELECT * FROM {entity_name.lower()}_data"
-            for entity_name in required_vars.keys()
-        )
-        
-        # Close the query
-        query += """
-        ) combined_data
-        ORDER BY entity_name, entity_instance_id, variable_name;
-        """
+            instance_id = input_filters.get(entity_name, {}).get('id')
+            if instance_id is not None:
+                instance_id = str(instance_id)
+            for var_name in var_names:
+                entity_names.append(entity_name)
+                entity_ids.append(entity.id)
+                variable_names.append(var_name)
+                instance_ids.append(instance_id)
         
-        return query 
\ No newline at end of file
+        return _VARIABLE_VALUES_QUERY, [entity_names, entity_ids, variable_names, instance_ids]
@@ -1,5 +1,7 @@
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import inspect
 import logging
+from collections import defaultdict
 
 from org.boxbuilder.variablesengine.models.project import Project
 from org.boxbuilder.variablesengine.models.variable import Variable
@@ -7,9 +9,49 @@ from org.boxbuilder.variablesengine.function_registry import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+
+def _accepts(signature: inspect.Signature, *args, **kwargs) -> bool:
+    try:
+        signature.bind(*args, **kwargs)
+    except TypeError:
+        return False
+    return True
+
+
+def _call_convention(function: Callable, input_var_names: Tuple[str, ...]) -> Optional[bool]:
+    """
+    Decide how a function is called with the values of its input variables.
+    
+    Args:
+        function: The registered function
+        input_var_names: The names of the variable's input variables
+        
+    Returns:
+        True to pass the single input value positionally, False to pass the input values as
+        keyword arguments named after the input variables, or None if the function accepts neither
+    """
+    try:
+        signature = inspect.signature(function)
+    except (TypeError, ValueError):
+        # Nothing to inspect (e.g. some builtins), so single inputs are passed positionally
+        return len(input_var_names) == 1
+    
+    accepts_keywords = _accepts(signature, **dict.fromkeys(input_var_names))
+    if len(input_var_names) == 1 and _accepts(signature, None):
+        # A single value goes positionally unless that would bind it to another parameter
+        # than the one named after the input variable
+        first_parameter = next(iter(signature.parameters.values()))
+        if not accepts_keywords or first_parameter.name == input_var_names[0]:
+            return True
+    return False if accepts_keywords else None
+
+
 class Engine:
     def __init__(self):
         self.function_registry = REGISTRY
+        # How each function is called, keyed by the function's id (registered callables need not be
+        # hashable) and its variable's input variable names
+        self._call_conventions: Dict[Tuple[int, Tuple[str, ...]], Tuple[Callable, Optional[bool]]] = {}
     
     def execute(
         self, 
@@ -31,117 +73,230 @@ class Engine:
         # Initialize results dictionary
         results = {}
         
-        # Create lookups for variables and entities
-        variable_lookup = {v.name: v for v in project.variables}
-        entity_lookup = {e.name: e for e in project.entities}
-        
-        # Create a cache for calculated values
-        calculated_values = {}
+        # Lookups for variables and entities, cached on the project
+        variable_lookup = project.variables_by_name
+        variables_by_entity_name = project.variables_by_entity_name
+        variable_entity_index = project.variable_entity_index
         
         # Process each entity and requested output variables
         for entity_name, variable_names in outputs.items():
-            if entity_name not in entity_lookup:
+            entity_variables = variables_by_entity_name.get(entity_name)
+            if entity_variables is None:
                 logger.warning(f"Entity '{entity_name}' not found in project")
                 continue
                 
-            entity = entity_lookup[entity_name]
             results[entity_name] = {}
             
             # Get input values for this entity
             entity_inputs = inputs.get(entity_name, {})
+            # Values are calculated from this entity's inputs, so each entity gets its own cache;
+            # outputs sharing dependencies reuse them instead of evaluating them again
+            calculated_values = {}
             
-            # Calculate each requested output variable
-            for var_name in variable_names:
-                if var_name not in variable_lookup:
-                    logger.warning(f"Variable '{var_name}' not found in project")
-                    continue
-                    
-                variable = variable_lookup[var_name]
-                
-                # Skip if the variable doesn't belong to this entity
-                if variable.entity_id != entity.id:
-                    logger.warning(f"Variable '{var_name}' does not belong to entity '{entity_name}'")
+            # Collect each requested output variable once, keeping the requested order
+            requested_variables = []
+            for var_name in dict.fromkeys(variable_names):
+                variable = entity_variables.get(var_name)
+                if variable is None:
+                    if var_name not in variable_entity_index:
+                        logger.warning(f"Variable '{var_name}' not found in project")
+                    else:
+                        # Skip if the variable doesn't belong to this entity
+                        logger.warning(f"Variable '{var_name}' does not belong to entity '{entity_name}'")
                     continue
-                
-                # Calculate the variable value
-                value = self._calculate_variable(
-                    variable=variable,
-                    entity_inputs=entity_inputs,
-                    variable_lookup=variable_lookup,
-                    calculated_values=calculated_values
-                )
-                
-                results[entity_name][var_name] = value
+                requested_variables.append(variable)
+            
+            # Calculate the variable values, dependencies before the variables using them
+            layers = self._plan(
+                variables=requested_variables,
+                entity_variables=entity_variables,
+                entity_inputs=entity_inputs,
+                variable_lookup=variable_lookup,
+                calculated_values=calculated_values
+            )
+            self._evaluate(layers, calculated_values)
+            
+            for variable in requested_variables:
+                results[entity_name][variable.name] = calculated_values[variable.name]
         
         return results
     
-    def _calculate_variable(
+    def _plan(
         self,
-        variable: Variable,
+        variables: List[Variable],
+        entity_variables: Dict[str, Variable],
         entity_inputs: Dict[str, Any],
         variable_lookup: Dict[str, Variable],
         calculated_values: Dict[str, Any]
-    ) -> Any:
+    ) -> List[List[Tuple[Variable, Callable, bool]]]:
         """
-        Calculate a variable value, handling dependencies recursively.
+        Plan the calculation of variables and their dependencies as layers of derived variables.
+        
+        Every variable in a layer only depends on variables resolved before it, so the layers can
+        be evaluated in order without recursion. Input variables and variables that cannot be
+        calculated are resolved while planning, the latter to None.
         
         Args:
-            variable: The variable to calculate
+            variables: The variables to calculate
+            entity_variables: Dictionary of this entity's variables by name, which input variable
+                names resolve to before falling back to variable_lookup
             entity_inputs: Input values for this entity
             variable_lookup: Dictionary of all variables by name
-            calculated_values: Cache of already calculated values
+            calculated_values: Cache of the values already calculated for this entity, including
+                the None of variables that could not be calculated
             
         Returns:
-            The calculated variable value
+            The layers of derived variables to evaluate, each with its function and whether the
+            function takes its single input value positionally
         """
-        # If already calculated, return from cache
-        if variable.name in calculated_values:
-            return calculated_values[variable.name]
-            
+        # Collect the derived variables to evaluate by walking the dependencies
+        planned: Dict[str, Tuple[Variable, Callable, bool]] = {}
+        stack = list(variables)
+        while stack:
+            current = stack.pop()
+            name = current.name
+            if name in calculated_values or name in planned:
+                continue
+            resolved = self._resolve_function(
+                current, entity_variables, entity_inputs, variable_lookup, calculated_values
+            )
+            if resolved is None:
+                continue
+            planned[name] = (current, *resolved)
+            for input_var_name in current.input_variables_tuple:
+                if input_var_name not in calculated_values and input_var_name not in planned:
+                    # Prefer the entity's own variable, so names shared by several entities do not collide
+                    stack.append(entity_variables.get(input_var_name) or variable_lookup[input_var_name])
+        
+        # Kahn's algorithm: a variable joins the layer after its last planned dependency
+        pending_dependencies = {
+            name: {n for n in variable.input_variables_tuple if n in planned}
+            for name, (variable, _, _) in planned.items()
+        }
+        dependents = defaultdict(list)
+        for name, dependencies in pending_dependencies.items():
+            for dependency in dependencies:
+                dependents[dependency].append(name)
+        
+        layers = []
+        layer = [name for name, dependencies in pending_dependencies.items() if not dependencies]
+        while layer:
+            layers.append([planned[name] for name in layer])
+            next_layer = []
+            for name in layer:
+                for dependent in dependents[name]:
+                    dependencies = pending_dependencies[dependent]
+                    dependencies.discard(name)
+                    if not dependencies:
+                        next_layer.append(dependent)
+            layer = next_layer
+        
+        # Variables still waiting for a dependency are in, or depend on, a cycle
+        for name, dependencies in pending_dependencies.items():
+            if dependencies:
+                logger.error(f"Circular dependency detected for variable '{name}'")
+                calculated_values[name] = None
+        
+        return layers
+    
+    def _resolve_function(
+        self,
+        variable: Variable,
+        entity_variables: Dict[str, Variable],
+        entity_inputs: Dict[str, Any],
+        variable_lookup: Dict[str, Variable],
+        calculated_values: Dict[str, Any]
+    ) -> Optional[Tuple[Callable, bool]]:
+        """
+        Return the function calculating a derived variable, and whether it takes its single input
+        value positionally. Input variables and variables that cannot be calculated are resolved
+        into calculated_values instead, and None is returned.
+        """
+        name = variable.name
+        
         # If it's an input variable, get from inputs
         if variable.is_input:
-            if variable.name in entity_inputs:
-                value = entity_inputs[variable.name]
-                calculated_values[variable.name] = value
-                return value
+            if name in entity_inputs:
+                calculated_values[name] = entity_inputs[name]
             else:
                 # Input variable not provided
-                logger.warning(f"Input variable '{variable.name}' not provided")
-                return None
+                logger.warning(f"Input variable '{name}' not provided")
+                calculated_values[name] = None
+            return None
         
         # For derived variables, calculate using the function
         if not variable.function_name:
-            logger.error(f"Derived variable '{variable.name}' has no function defined")
+            logger.error(f"Derived variable '{name}' has no function defined")
+            calculated_values[name] = None
             return None
-            
+        
         # Get the function from registry
         function = self.function_registry.get(variable.function_name)
         if not function:
-            logger.error(f"Function '{variable.function_name}' not found for variable '{variable.name}'")
+            logger.error(f"Function '{variable.function_name}' not found for variable '{name}'")
+            calculated_values[name] = None
             return None
-            
-        # Calculate input variable values
-        input_values = {}
-        for input_var_name in variable.input_variables:
-            if input_var_name not in variable_lookup:
-                logger.error(f"Input variable '{input_var_name}' not found")
-                return None
-                
-            input_variable = variable_lookup[input_var_name]
-            input_value = self._calculate_variable(
-                variable=input_variable,
-                entity_inputs=entity_inputs,
-                variable_lookup=variable_lookup,
-                calculated_values=calculated_values
+        
+        missing_input_var_name = next(
+            (
+                n for n in variable.input_variables_tuple
+                if n not in entity_variables and n not in variable_lookup
+            ),
+            None
+        )
+        if missing_input_var_name is not None:
+            logger.error(f"Input variable '{missing_input_var_name}' not found")
+            calculated_values[name] = None
+            return None
+        
+        positional = self._get_call_convention(function, variable.input_variables_tuple)
+        if positional is None:
+            logger.error(
+                f"Function '{variable.function_name}' does not accept the input variables "
+                f"{list(variable.input_variables_tuple)} of variable '{name}'"
             )
-            
-            input_values[input_var_name] = input_value
-            
-        # Execute the function with inputs
-        try:
-            result = function(**input_values)
-            calculated_values[variable.name] = result
-            return result
-        except Exception as e:
-            logger.error(f"Error calculating variable '{variable.name}': {str(e)}")
-            return None
\ No newline at end of file
+            calculated_values[name] = None
+            return None
+        
+        return function, positional
+    
+    def _get_call_convention(self, function: Callable, input_var_names: Tuple[str, ...]) -> Optional[bool]:
+        """Return the cached `_call_convention` of a function, inspecting its signature once."""
+        key = (id(function), input_var_names)
+        cached = self._call_conventions.get(key)
+        # The function is kept in the entry, so its id cannot be reused by another object while cached
+        if cached is None or cached[0] is not function:
+            cached = (function, _call_convention(function, input_var_names))
+            self._call_conventions[key] = cached
+        return cached[1]
+    
+    def _evaluate(
+        self,
+        layers: List[List[Tuple[Variable, Callable, bool]]],
+        calculated_values: Dict[str, Any]
+    ):
+        """
+        Evaluate planned layers in order, storing each result (None on error) in calculated_values.
+        
+        Functions planned as positional receive their single input value positionally, the others
+        receive their input values as keyword arguments named after the input variables.
+        """
+        for layer in layers:
+            for variable, function, positional in layer:
+                input_var_names = variable.input_variables_tuple
+                # The input values are read before the try, so only the function call is guarded
+                if positional:
+                    input_value = calculated_values[input_var_names[0]]
+                else:
+                    input_values = {
+                        input_var_name: calculated_values[input_var_name]
+                        for input_var_name in input_var_names
+                    }
+                # Execute the function with inputs
+                try:
+                    calculated_values[variable.name] = (
+                        function(input_value) if positional else function(**input_values)
+                    )
+                except Exception as e:
+                    logger.error(f"Error calculating variable '{variable.name}': {str(e)}")
+                    calculated_values[variable.name] = None
@@ -1,7 +1,16 @@
-from pydantic import BaseModel
+import sys
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
 
 
 class Entity(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
 
+    def model_post_init(self, __context: Any) -> None:
+        # Interned, as entity names and ids key the project's lookups
+        self.__dict__['id'] = sys.intern(self.id)
+        self.__dict__['name'] = sys.intern(self.name)
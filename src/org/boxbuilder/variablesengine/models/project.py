@@ -1,13 +1,58 @@
-from typing import List
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from org.boxbuilder.variablesengine.models.entity import Entity
 from org.boxbuilder.variablesengine.models.variable import Variable
 
 
 class Project(BaseModel):
+    # Frozen, as the cached lookups below would go stale if the fields were reassigned; copies
+    # drop them (see `model_copy`)
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     entities: List[Entity] = Field(default_factory=list)
     variables: List[Variable] = Field(default_factory=list)
+
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False) -> "Project":
+        copied = super().model_copy(update=update, deep=deep)
+        # The cached lookups were copied along with the fields, so they are built again on first
+        # access from the possibly updated fields
+        for name in _CACHED_LOOKUPS:
+            copied.__dict__.pop(name, None)
+        return copied
+
+    @cached_property
+    def variables_by_name(self) -> Dict[str, Variable]:
+        """Returns the project's variables keyed by name, built on first access."""
+        return {v.name: v for v in self.variables}
+
+    @cached_property
+    def entities_by_name(self) -> Dict[str, Entity]:
+        """Returns the project's entities keyed by name, built on first access."""
+        return {e.name: e for e in self.entities}
+
+    @cached_property
+    def variable_entity_index(self) -> Dict[str, str]:
+        """Returns the entity id of each variable keyed by variable name, built on first access."""
+        return {v.name: v.entity_id for v in self.variables}
+
+    @cached_property
+    def variables_by_entity_name(self) -> Dict[str, Dict[str, Variable]]:
+        """
+        Returns each entity's variables keyed by variable name, keyed by entity name, built on
+        first access. Unlike `variables_by_name`, names shared by several entities do not collide.
+        """
+        variables_by_entity_id: Dict[str, Dict[str, Variable]] = {}
+        for v in self.variables:
+            variables_by_entity_id.setdefault(v.entity_id, {})[v.name] = v
+        return {e.name: variables_by_entity_id.get(e.id, {}) for e in self.entities}
+
+
+# The names of Project's cached_property lookups, stored in the instance dict once built
+_CACHED_LOOKUPS = tuple(
+    name for name, attribute in vars(Project).items() if isinstance(attribute, cached_property)
+)
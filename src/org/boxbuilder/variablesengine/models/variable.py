@@ -1,8 +1,20 @@
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+import sys
+from typing import Optional, Dict, Any, Mapping
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Variable(BaseModel):
+    """
+    A variable of an entity, either provided as input or derived by a registered function.
+
+    Besides the fields, every instance has plain attributes derived from `metadata` once at
+    creation, read on the engine and data puller hot paths:
+        input_variables_tuple: The names of the input variables, in order.
+        dependencies: The names of the input variables as a frozenset.
+        foreign_key_entity: The entity name this variable references, if it's a foreign key.
+    """
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     entity_id: str
@@ -12,12 +24,27 @@ class Variable(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     description: Optional[str] = None
 
+    def model_post_init(self, __context: Any) -> None:
+        self._set_derived_attributes()
+
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False) -> "Variable":
+        copied = super().model_copy(update=update, deep=deep)
+        # The derived attributes were copied along with the fields, so they are derived again
+        # from the possibly updated fields
+        copied._set_derived_attributes()
+        return copied
+
+    def _set_derived_attributes(self) -> None:
+        # Names are interned, as they key every lookup in the engine and the data puller
+        self.__dict__['name'] = sys.intern(self.name)
+        self.__dict__['entity_id'] = sys.intern(self.entity_id)
+        # Stored in the instance dict, so reads skip both the property call and pydantic's
+        # private attribute lookup; the model is frozen, and copies derive them again
+        input_variables_tuple = tuple(sys.intern(n) for n in self.input_variables)
+        self.__dict__['input_variables_tuple'] = input_variables_tuple
+        self.__dict__['dependencies'] = frozenset(input_variables_tuple)
+        self.__dict__['foreign_key_entity'] = (self.metadata.get('foreign_key') or {}).get('entity')
+
     @property
     def input_variables(self) -> list[str]:
         return self.metadata.get('input_variables', [])
-
-    @property
-    def foreign_key_entity(self) -> Optional[str]:
-        """Returns the entity name this variable references, if it's a foreign key."""
-        foreign_key = self.metadata.get('foreign_key', {})
-        return foreign_key.get('entity')
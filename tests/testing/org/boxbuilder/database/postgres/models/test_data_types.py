@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from org.boxbuilder.database.postgres.models.data_types import DataTypes
+
+
+def _convert_each(data_type: DataTypes, series: pd.Series) -> list:
+    """Convert a series value by value, with missing values (None, NaN, NaT) as None."""
+    return [
+        None if not isinstance(v, (dict, list)) and pd.isna(v) else data_type.validate_and_convert(v)
+        for v in series
+    ]
+
+
+def _typed(values: list) -> list:
+    return [(type(v), v) for v in values]
+
+
+class TestDataTypes:
+    @pytest.mark.parametrize("data_type, series", [
+        (DataTypes.TEXT, pd.Series(["a", 1, None, np.nan, 2.5], dtype="object")),
+        (DataTypes.TEXT, pd.Series(["a", None], dtype="string")),
+        (DataTypes.NUMBER, pd.Series([1, 2.5, "3", None, np.nan], dtype="object")),
+        (DataTypes.NUMBER, pd.Series([1.5, np.nan])),
+        (DataTypes.TEXT, pd.Series([1, None], dtype="Int64")),
+        (DataTypes.BOOLEAN, pd.Series([True, False, None], dtype="object")),
+        (DataTypes.BOOLEAN, pd.Series([True, None], dtype="boolean")),
+        (DataTypes.BOOLEAN, pd.Series(["true", "FALSE", None], dtype="object")),
+        (DataTypes.BOOLEAN, pd.Series([1, 0])),
+        (DataTypes.JSON, pd.Series([{"a": 1}, "[1]", None, [1, 2]], dtype="object")),
+        (DataTypes.DATE, pd.Series(["2024-01-02", None], dtype="object")),
+        (DataTypes.DATE, pd.Series(pd.to_datetime(["2024-01-02 03:04:05", None]))),
+        (DataTypes.TIME, pd.Series(["12:34:56", None], dtype="object")),
+        (DataTypes.TIME, pd.Series(pd.to_datetime(["2024-01-02 03:04:05", None]))),
+        (DataTypes.TIMESTAMP, pd.Series(["2024-01-02 03:04:05", None], dtype="object")),
+        (DataTypes.TIMESTAMP, pd.Series(["2024-01-02T03:04:05", "2024-01-02 03:04"], dtype="object")),
+        (DataTypes.TIMESTAMP, pd.Series(pd.to_datetime(["2024-01-02 03:04:05", None]))),
+        (DataTypes.TIMESTAMP, pd.Series([datetime(2024, 1, 2, 3, 4, 5), None], dtype="object")),
+        (DataTypes.TIMESTAMP_WITH_TIMEZONE, pd.Series(["2024-01-02 03:04:05+0000", None], dtype="object")),
+        (DataTypes.TIMESTAMP_WITH_TIMEZONE, pd.Series(pd.to_datetime(["2024-01-02 03:04:05", None]).tz_localize("UTC"))),
+        (DataTypes.TIMESTAMP_WITH_TIMEZONE, pd.Series([datetime(2024, 1, 2, tzinfo=timezone.utc), None], dtype="object")),
+    ])
+    def test_convert_series_matches_validate_and_convert(self, data_type, series):
+        """Test that converting a series gives the values (and types) of converting each value."""
+        converted = data_type.convert_series(series)
+        
+        assert converted.dtype == object
+        assert converted.index.equals(series.index)
+        assert _typed(converted.tolist()) == _typed(_convert_each(data_type, series))
+    
+    def test_convert_series_keeps_index(self):
+        """Test that values are converted in place of their index labels."""
+        series = pd.Series(["b", None, "a"], index=[10, 5, 7], dtype="object")
+        
+        converted = DataTypes.TEXT.convert_series(series)
+        
+        assert converted.to_dict() == {10: "b", 5: None, 7: "a"}
+    
+    @pytest.mark.parametrize("data_type, series", [
+        (DataTypes.BOOLEAN, pd.Series(["true", "maybe"], dtype="object")),
+        (DataTypes.JSON, pd.Series(["{not json"], dtype="object")),
+        (DataTypes.DATE, pd.Series(["not a date"], dtype="object")),
+        (DataTypes.TIMESTAMP, pd.Series(pd.to_datetime(["2024-01-02"]).tz_localize("UTC"))),
+        (DataTypes.TIMESTAMP_WITH_TIMEZONE, pd.Series(["2024-01-02 03:04:05"], dtype="object")),
+    ])
+    def test_convert_series_raises_like_validate_and_convert(self, data_type, series):
+        """Test that invalid values raise the error converting them individually raises."""
+        with pytest.raises(Exception) as expected:
+            _convert_each(data_type, series)
+        
+        with pytest.raises(expected.type):
+            data_type.convert_series(series)
+    
+    def test_convert_series_of_missing_values(self):
+        """Test that a series of only missing values converts to Nones for every data type."""
+        series = pd.Series([None, np.nan], dtype="object")
+        
+        for data_type in DataTypes:
+            assert data_type.convert_series(series).tolist() == [None, None]
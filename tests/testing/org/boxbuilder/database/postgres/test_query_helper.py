@@ -0,0 +1,198 @@
+import uuid
+from contextlib import asynccontextmanager
+
+import pandas as pd
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock
+
+from org.boxbuilder.database.postgres.models.connection_properties import (
+    ConnectionProperties,
+    build_from_env_variables,
+)
+from org.boxbuilder.database.postgres.models.data_types import DataTypes
+from org.boxbuilder.database.postgres.models.table_model import TableModel
+from org.boxbuilder.database.postgres.query_helper import (
+    QueryHelper,
+    _COPY_INSERT_MIN_ROWS,
+    _decode_jsonb,
+    _encode_jsonb,
+)
+
+_DATABASE = "variables_engine"
+
+
+@pytest_asyncio.fixture
+async def query_helper():
+    """A QueryHelper connected to the database from the POSTGRES_DB_* environment variables."""
+    try:
+        helper = QueryHelper(build_from_env_variables(), min_pool_size=1, max_pool_size=2)
+        await helper.open_pool(_DATABASE)
+    except Exception as e:
+        pytest.skip(f"No database available: {e}")
+    yield helper
+    await helper.close()
+
+
+@pytest_asyncio.fixture
+async def schema_name(query_helper):
+    """A schema of its own for each test, dropped afterwards."""
+    schema_name = f"test_{uuid.uuid4().hex}"
+    await query_helper.create_schema(_DATABASE, schema_name)
+    yield schema_name
+    await query_helper.drop_schema(_DATABASE, schema_name)
+
+
+def _mock_connection() -> AsyncMock:
+    """A connection mock whose transaction() works as an async context manager."""
+    connection = AsyncMock()
+    
+    @asynccontextmanager
+    async def transaction():
+        yield
+    
+    connection.transaction = Mock(side_effect=transaction)
+    return connection
+
+
+def _helper_with_connection(connection: AsyncMock) -> QueryHelper:
+    """A QueryHelper whose pool for the test database hands out the given connection."""
+    helper = QueryHelper(ConnectionProperties(url="localhost", user_name="user", password="password"))
+    
+    @asynccontextmanager
+    async def acquire():
+        yield connection
+    
+    pool = Mock()
+    pool.acquire = Mock(side_effect=acquire)
+    helper._db_pool[_DATABASE] = pool
+    return helper
+
+
+def _table_model(schema_name: str = "public", primary_keys=None) -> TableModel:
+    return TableModel(
+        database=_DATABASE,
+        schema=schema_name,
+        table="items",
+        primary_keys=primary_keys,
+        column_name_to_data_type_map={"id": DataTypes.NUMBER, "name": DataTypes.TEXT},
+    )
+
+
+class TestQueryHelper:
+    def test_jsonb_codec_round_trip(self):
+        """Test that jsonb values use the binary wire format in both directions."""
+        assert _encode_jsonb({"a": 1}) == b'\x01{"a": 1}'
+        assert _encode_jsonb('{"a": "ü"}') == b'\x01{"a": "\xc3\xbc"}'
+        assert _decode_jsonb(b'\x01{"a": "\xc3\xbc"}') == '{"a": "ü"}'
+        
+        with pytest.raises(RuntimeError):
+            _decode_jsonb(b'\x02{}')
+    
+    @pytest.mark.asyncio
+    async def test_jsonb_codec_is_binary(self):
+        """Test that the jsonb codec is registered in the binary format COPY requires."""
+        connection = AsyncMock()
+        
+        await QueryHelper._init_connection(connection)
+        
+        connection.set_type_codec.assert_awaited_once()
+        assert connection.set_type_codec.await_args.kwargs["format"] == "binary"
+    
+    @pytest.mark.asyncio
+    async def test_copy_insert_into_json_column(self, query_helper, schema_name):
+        """Test that inserts large enough to use COPY load JSON columns."""
+        table_model = TableModel(
+            database=_DATABASE,
+            schema=schema_name,
+            table="documents",
+            column_name_to_data_type_map={"id": DataTypes.NUMBER, "doc": DataTypes.JSON},
+        )
+        await query_helper.create_table(table_model)
+        df = pd.DataFrame({
+            "id": range(_COPY_INSERT_MIN_ROWS),
+            "doc": [{"n": i, "name": "ü"} for i in range(_COPY_INSERT_MIN_ROWS)],
+        })
+        
+        await query_helper.insert_dataframe(table_model, df)
+        
+        results = await query_helper.get_query_results_as_dictionaries(
+            _DATABASE,
+            f"SELECT doc FROM {table_model.get_fqn()} WHERE id = $1",
+            [1],
+        )
+        assert results == [{"doc": '{"n": 1, "name": "ü"}'}]
+    
+    def test_insert_query_is_cached_per_columns(self):
+        """Test that insert queries are built once per table, columns and primary keys."""
+        helper = _helper_with_connection(_mock_connection())
+        table_model = _table_model(primary_keys=["id"])
+        
+        query = helper._get_insert_query(table_model, {"id": DataTypes.NUMBER, "name": DataTypes.TEXT})
+        same_columns_query = helper._get_insert_query(table_model, {"id": DataTypes.TEXT, "name": DataTypes.JSON})
+        other_columns_query = helper._get_insert_query(table_model, {"id": DataTypes.NUMBER})
+        
+        assert same_columns_query is query
+        assert other_columns_query != query
+        assert len(helper._insert_query_cache) == 2
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("row_count, copied", [
+        (_COPY_INSERT_MIN_ROWS - 1, False),
+        (_COPY_INSERT_MIN_ROWS, True),
+    ])
+    async def test_insert_switches_to_copy_at_min_rows(self, row_count, copied):
+        """Test that inserts use executemany below _COPY_INSERT_MIN_ROWS rows and COPY from there."""
+        connection = _mock_connection()
+        helper = _helper_with_connection(connection)
+        values = [(i, f"name {i}") for i in range(row_count)]
+        
+        await helper._insert_tuples_into_table(
+            _table_model(), {"id": DataTypes.NUMBER, "name": DataTypes.TEXT}, values
+        )
+        
+        if copied:
+            connection.executemany.assert_not_awaited()
+            connection.copy_records_to_table.assert_awaited_once_with(
+                "items", records=values, columns=["id", "name"], schema_name="public"
+            )
+        else:
+            connection.copy_records_to_table.assert_not_awaited()
+            connection.executemany.assert_awaited_once()
+            assert connection.executemany.await_args.args[1] == values
+    
+    @pytest.mark.asyncio
+    async def test_copy_with_primary_keys_upserts_through_staging_table(self):
+        """Test that tables with primary keys are loaded into a staging table and merged from there."""
+        connection = _mock_connection()
+        values = [(1, "first"), (2, "second"), (1, "last")]
+        
+        await QueryHelper._copy_tuples_into_table(
+            connection, _table_model(primary_keys=["id"]), ["id", "name"], values
+        )
+        
+        # Only the last row per primary key is staged
+        connection.copy_records_to_table.assert_awaited_once_with(
+            "_staging_items", records=[(1, "last"), (2, "second")], columns=["id", "name"]
+        )
+        create_statement, merge_statement = [call.args[0] for call in connection.execute.await_args_list]
+        assert 'CREATE TEMPORARY TABLE "_staging_items" ON COMMIT DROP' in create_statement
+        assert 'FROM "_staging_items"' in merge_statement
+        assert 'ON CONFLICT ("id")' in merge_statement
+        assert '"name" = EXCLUDED."name"' in merge_statement
+    
+    @pytest.mark.asyncio
+    async def test_copy_upsert_into_table(self, query_helper, schema_name):
+        """Test that inserts large enough to use COPY upsert into tables with primary keys."""
+        table_model = _table_model(schema_name, primary_keys=["id"])
+        await query_helper.create_table(table_model)
+        ids = range(_COPY_INSERT_MIN_ROWS)
+        
+        await query_helper.insert_dataframe(table_model, pd.DataFrame({"id": ids, "name": "old"}))
+        await query_helper.insert_dataframe(table_model, pd.DataFrame({"id": ids, "name": "new"}))
+        
+        results = await query_helper.get_query_results_as_dictionaries(
+            _DATABASE,
+            f"SELECT name, COUNT(*) AS count FROM {table_model.get_fqn()} GROUP BY name",
+        )
+        assert results == [{"name": "new", "count": _COPY_INSERT_MIN_ROWS}]
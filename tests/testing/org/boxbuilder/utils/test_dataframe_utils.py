@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from org.boxbuilder.utils.dataframe_utils import build_hash_column
+
+
+class TestDataframeUtils:
+    def test_build_hash_column_with_mixed_column_types(self):
+        """Test that hashes stringify the values of a row cast to the row's common dtype."""
+        # The int column is hashed as floats ("1.0|1.5"), like the rows of df.apply(axis=1)
+        df = pd.DataFrame({"id": [1, 2], "price": [1.5, np.nan]})
+        
+        build_hash_column(df)
+        
+        assert df["hash"].tolist() == [
+            "530aedd8b66e6ecc876e50840c822b9ac2b362c21931a62fa18a0519b1ea6ff8",
+            "cb605eeb21ecb2e4136e064b10f9be6cb2b00093de9e12ca05e7c5547848857b",
+        ]
+    
+    def test_build_hash_column_with_included_columns(self):
+        """Test that only the included columns are hashed, in an object dtype row ("1|a")."""
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None], "price": [1.5, 2.0]})
+        
+        build_hash_column(df, include_columns=["id", "name"])
+        
+        assert df["hash"].tolist() == [
+            "d55e0424345a817e3757ad3bb43e6c7d888b5c8aa7df55a9d012245663052698",
+            "15421f713d8c9c9228cd307d592090c7c29e92ac91b0895d02db0fdc24ff7187",
+        ]
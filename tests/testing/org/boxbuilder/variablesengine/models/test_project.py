@@ -0,0 +1,24 @@
+from org.boxbuilder.variablesengine.models.entity import Entity
+from org.boxbuilder.variablesengine.models.project import Project
+from org.boxbuilder.variablesengine.models.variable import Variable
+
+
+class TestProject:
+    def test_model_copy_rebuilds_cached_lookups(self):
+        entity = Entity(id="entity1", name="Customer")
+        age = Variable(id="var1", name="age", entity_id="entity1", metadata={})
+        income = Variable(id="var2", name="income", entity_id="entity1", metadata={})
+        project = Project(id="project1", name="Test", entities=[entity], variables=[age])
+        
+        # Build the cached lookups before copying
+        assert set(project.variables_by_name) == {"age"}
+        assert set(project.variable_entity_index) == {"age"}
+        assert set(project.variables_by_entity_name["Customer"]) == {"age"}
+        
+        copied = project.model_copy(update={"variables": [age, income]})
+        
+        # Verify the copy's lookups reflect its updated variables while the original's are unchanged
+        assert set(copied.variables_by_name) == {"age", "income"}
+        assert set(copied.variable_entity_index) == {"age", "income"}
+        assert set(copied.variables_by_entity_name["Customer"]) == {"age", "income"}
+        assert set(project.variables_by_name) == {"age"}
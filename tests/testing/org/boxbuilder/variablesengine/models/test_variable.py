@@ -0,0 +1,20 @@
+from org.boxbuilder.variablesengine.models.variable import Variable
+
+
+class TestVariable:
+    def test_model_copy_derives_attributes_again(self):
+        variable = Variable(
+            id="var1", name="total", entity_id="entity1", is_input=False, function_name="add",
+            metadata={"input_variables": ["amount"]}
+        )
+        
+        copied = variable.model_copy(update={
+            "metadata": {"input_variables": ["amount", "tax"], "foreign_key": {"entity": "Customer"}}
+        })
+        
+        # Verify the copy reflects its updated metadata while the original is unchanged
+        assert copied.input_variables_tuple == ("amount", "tax")
+        assert copied.dependencies == frozenset({"amount", "tax"})
+        assert copied.foreign_key_entity == "Customer"
+        assert variable.input_variables_tuple == ("amount",)
+        assert variable.foreign_key_entity is None
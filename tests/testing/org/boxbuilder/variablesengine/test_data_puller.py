@@ -1,12 +1,30 @@
+import asyncio
+import gc
+import json
+
 import pytest
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock
 from typing import Dict, Any
 
 from org.boxbuilder.variablesengine.models.project import Project
 from org.boxbuilder.variablesengine.models.entity import Entity
 from org.boxbuilder.variablesengine.models.variable import Variable
-from org.boxbuilder.variablesengine.data_puller import DataPuller
-from org.boxbuilder.database.postgres.query_helper import QueryHelper
+from org.boxbuilder.variablesengine.data_puller import DataPuller, _VARIABLE_VALUES_COLUMN_TYPES
+from org.boxbuilder.database.postgres.query_helper import QueryHelper, _decode_jsonb, _encode_jsonb
+
+
+def _fetched(row):
+    """Return a row as QueryHelper returns it, with the value stored as jsonb and read back."""
+    encoded = {**row, "value": _decode_jsonb(_encode_jsonb(json.dumps(row["value"])))}
+    return QueryHelper._convert_row(encoded, QueryHelper._build_converters(_VARIABLE_VALUES_COLUMN_TYPES))
+
+
+def _stream_of(rows):
+    """Return a side effect that yields the given rows like QueryHelper.stream_query_results."""
+    async def stream(**kwargs):
+        for row in rows:
+            yield _fetched(row)
+    return stream
 
 
 class TestDataPuller:
@@ -95,7 +113,7 @@ class TestDataPuller:
     def mock_query_helper(self):
         """Create a mock QueryHelper for testing."""
         helper = Mock(spec=QueryHelper)
-        helper.get_query_results_as_dictionaries = AsyncMock()
+        helper.stream_query_results = Mock()
         return helper
     
     @pytest.fixture
@@ -125,6 +143,24 @@ class TestDataPuller:
         assert customer_id.dependencies == set()
         assert customer_id.foreign_keys == {"customer_id": "Customer"}
     
+    def test_dependency_graph_is_cached_per_project(self, data_puller, sample_project):
+        """Test that the dependency graph is reused until it is invalidated."""
+        graph = data_puller._get_dependency_graph(sample_project)
+        assert data_puller._get_dependency_graph(sample_project) is graph
+        
+        data_puller.invalidate_dependency_graph(sample_project.id)
+        rebuilt_graph = data_puller._get_dependency_graph(sample_project)
+        assert rebuilt_graph is not graph
+        
+        # A different instance with the same id gets its own graph
+        reloaded_project = sample_project.model_copy()
+        assert data_puller._get_dependency_graph(reloaded_project) is not rebuilt_graph
+        
+        # The cache does not keep the project alive
+        del reloaded_project
+        gc.collect()
+        assert sample_project.id not in data_puller._dependency_graphs
+    
     def test_get_required_variables(self, data_puller, sample_project):
         """Test determining required variables."""
         requested_outputs = {
@@ -172,11 +208,23 @@ class TestDataPuller:
         assert "Customer" in required_vars
         assert required_vars["Customer"] == {"id"}
     
+    def test_build_optimal_query_text_is_constant(self, data_puller, sample_project):
+        """Test that the SQL text does not depend on the required variables, only the parameters do."""
+        query, params = data_puller._build_optimal_query(
+            sample_project, {"Customer": {"name", "age"}}, {}
+        )
+        other_query, other_params = data_puller._build_optimal_query(
+            sample_project, {"Customer": {"income"}, "Order": {"amount", "customer_id"}}, {}
+        )
+        
+        assert query is other_query
+        assert params != other_params
+    
     @pytest.mark.asyncio
     async def test_pull_data(self, data_puller, sample_project, mock_query_helper):
         """Test pulling data from the database."""
         # Mock database response
-        mock_query_helper.get_query_results_as_dictionaries.return_value = [
+        mock_query_helper.stream_query_results.side_effect = _stream_of([
             {
                 "entity_name": "Customer",
                 "entity_instance_id": "123",
@@ -195,7 +243,7 @@ class TestDataPuller:
                 "variable_name": "amount",
                 "value": 100.50
             }
-        ]
+        ])
         
         requested_outputs = {
             "Customer": ["name", "credit_score"],
@@ -223,20 +271,182 @@ class TestDataPuller:
         assert results["Order"]["amount"] == 100.50
         
         # Verify query was called with correct parameters
-        mock_query_helper.get_query_results_as_dictionaries.assert_called_once()
-        query = mock_query_helper.get_query_results_as_dictionaries.call_args[1]["query"]
+        mock_query_helper.stream_query_results.assert_called_once()
+        query = mock_query_helper.stream_query_results.call_args[1]["query"]
+        
+        # Verify a single query is used for all entities, with the values bound as parameters
+        assert "UNION ALL" not in query
+        assert "'entity1'" not in query
+        params = mock_query_helper.stream_query_results.call_args[1]["params"]
+        entity_names, entity_ids, variable_names, instance_ids = params
+        required_pairs = set(zip(entity_names, entity_ids, variable_names, instance_ids))
+        
+        # The provided Customer id limits the Customer values to that instance
+        assert ("Customer", "entity1", "credit_score", "123") in required_pairs
+        assert ("Order", "entity2", "amount", None) in required_pairs
+    
+    @pytest.mark.asyncio
+    async def test_pull_data_decodes_json_values(self, data_puller, sample_project, mock_query_helper):
+        """Test that the jsonb values read back as JSON text are decoded."""
+        mock_query_helper.stream_query_results.side_effect = _stream_of([
+            {"entity_name": "Customer", "entity_instance_id": "123", "variable_name": "name", "value": "John"},
+            {"entity_name": "Customer", "entity_instance_id": "123", "variable_name": "credit_score", "value": 30},
+            {"entity_name": "Order", "entity_instance_id": "456", "variable_name": "amount", "value": None}
+        ])
+        
+        results = await data_puller.pull_data(
+            sample_project, {"Customer": ["name", "credit_score"], "Order": ["amount"]}, {}
+        )
+        
+        assert results == {"Customer": {"name": "John", "credit_score": 30}, "Order": {"amount": None}}
+        assert results["Customer"]["credit_score"] >= 18
+    
+    @pytest.mark.asyncio
+    async def test_pull_data_fetches_pinned_instances(self, data_puller, sample_project, mock_query_helper):
+        """Test that values of entities all pinned to an instance are fetched without a stream."""
+        mock_query_helper.get_query_results_as_dictionaries.return_value = [
+            _fetched({
+                "entity_name": "Customer",
+                "entity_instance_id": "123",
+                "variable_name": "name",
+                "value": "John Doe"
+            })
+        ]
+        
+        results = await data_puller.pull_data(sample_project, {"Customer": ["name"]}, {"Customer": {"id": "123"}})
+        
+        assert results == {"Customer": {"name": "John Doe"}}
+        mock_query_helper.get_query_results_as_dictionaries.assert_awaited_once()
+        mock_query_helper.stream_query_results.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_pull_data_share_one_query(self, data_puller, sample_project, mock_query_helper):
+        """Test that concurrent calls for the same project are served by a single query."""
+        mock_query_helper.stream_query_results.side_effect = _stream_of([
+            {
+                "entity_name": "Customer",
+                "entity_instance_id": "123",
+                "variable_name": "name",
+                "value": "John Doe"
+            },
+            {
+                "entity_name": "Order",
+                "entity_instance_id": "456",
+                "variable_name": "amount",
+                "value": 100.50
+            }
+        ])
+        
+        customer_results, order_results = await asyncio.gather(
+            data_puller.pull_data(sample_project, {"Customer": ["name"]}, {}),
+            data_puller.pull_data(sample_project, {"Order": ["amount"]}, {})
+        )
+        
+        mock_query_helper.stream_query_results.assert_called_once()
+        
+        # Each caller only gets the variables it asked for
+        assert customer_results == {"Customer": {"name": "John Doe"}}
+        assert order_results == {"Order": {"amount": 100.50}}
+    
+    @pytest.mark.asyncio
+    async def test_pull_data_joins_running_query(self, data_puller, sample_project, mock_query_helper):
+        """Test that a call made while an identical query is running waits for that query."""
+        query_started = asyncio.Event()
+        release_rows = asyncio.Event()
+        
+        async def stream(**kwargs):
+            query_started.set()
+            await release_rows.wait()
+            yield _fetched({
+                "entity_name": "Customer",
+                "entity_instance_id": "123",
+                "variable_name": "name",
+                "value": "John Doe"
+            })
+        
+        mock_query_helper.stream_query_results.side_effect = stream
+        
+        first = asyncio.create_task(data_puller.pull_data(sample_project, {"Customer": ["name"]}, {}))
+        await query_started.wait()
+        second = asyncio.create_task(data_puller.pull_data(sample_project, {"Customer": ["name"]}, {}))
+        await asyncio.sleep(0)
+        release_rows.set()
+        
+        assert await first == {"Customer": {"name": "John Doe"}}
+        assert await second == {"Customer": {"name": "John Doe"}}
+        mock_query_helper.stream_query_results.assert_called_once()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("during_query", [False, True])
+    async def test_cancelled_flush_cancels_waiting_calls(self, sample_project, mock_query_helper, during_query):
+        """Test that calls waiting for a read are cancelled with it instead of waiting forever."""
+        query_started = asyncio.Event()
+        
+        async def stream(**kwargs):
+            query_started.set()
+            await asyncio.Event().wait()
+            yield
+        
+        mock_query_helper.stream_query_results.side_effect = stream
+        # Without a query the flush stays in its coalescing window until cancelled
+        data_puller = DataPuller(mock_query_helper, coalesce_window_seconds=0 if during_query else 60)
+        
+        call = asyncio.create_task(data_puller.pull_data(sample_project, {"Customer": ["name"]}, {}))
+        if during_query:
+            await query_started.wait()
+        else:
+            await asyncio.sleep(0)
+        for flush_task in list(data_puller._flush_tasks):
+            flush_task.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, timeout=1)
+        assert not data_puller._pending_reads
+        assert not data_puller._running_reads
+    
+    @pytest.mark.asyncio
+    async def test_pull_data_with_concurrent_entity_queries(self, sample_project, mock_query_helper):
+        """Test that each entity gets its own query when concurrent entity queries are enabled."""
+        mock_query_helper.stream_query_results.side_effect = lambda **kwargs: _stream_of([
+            {
+                "entity_name": entity_name,
+                "entity_instance_id": "1",
+                "variable_name": variable_name,
+                "value": f"{entity_name}.{variable_name}"
+            }
+            for entity_name, variable_name in zip(kwargs["params"][0], kwargs["params"][2])
+        ])(**kwargs)
+        data_puller = DataPuller(mock_query_helper, concurrent_entity_queries=True)
+        
+        results = await data_puller.pull_data(
+            sample_project,
+            {"Customer": ["name"], "Order": ["amount"]},
+            {}
+        )
+        
+        assert mock_query_helper.stream_query_results.call_count == 2
+        assert results == {
+            "Customer": {"name": "Customer.name"},
+            "Order": {"amount": "Order.amount"}
+        }
+    
+    @pytest.mark.asyncio
+    async def test_pull_data_without_required_variables(self, data_puller, sample_project, mock_query_helper):
+        """Test that nothing is queried when no variables are required."""
+        results = await data_puller.pull_data(sample_project, {}, {})
+        unknown_entity_results = await data_puller.pull_data(sample_project, {"Unknown": ["name"]}, {})
         
-        # Verify query contains expected elements
-        assert "WITH" in query
-        assert "customer_data" in query.lower()
-        assert "order_data" in query.lower()
-        assert "UNION ALL" in query
+        assert results == {}
+        assert unknown_entity_results == {}
+        mock_query_helper.stream_query_results.assert_not_called()
+        mock_query_helper.get_query_results_as_dictionaries.assert_not_called()
+        assert not data_puller._flush_tasks
     
     @pytest.mark.asyncio
     async def test_pull_data_error_handling(self, data_puller, sample_project, mock_query_helper):
         """Test error handling during data pulling."""
         # Mock database error
-        mock_query_helper.get_query_results_as_dictionaries.side_effect = Exception("Database error")
+        mock_query_helper.stream_query_results.side_effect = Exception("Database error")
         
         results = await data_puller.pull_data(
             sample_project,
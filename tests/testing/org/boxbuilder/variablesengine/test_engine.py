@@ -146,6 +146,50 @@ class TestEngine:
         # Verify exception handling returns None
         assert results["Customer"]["is_adult"] is None
     
+    def test_function_calling_conventions(self, sample_project):
+        # Register single input functions taking their value positionally, by keyword only and as kwargs
+        engine = Engine()
+        engine.function_registry = {
+            "check_adult": lambda value: value >= 18,
+            "calculate_tax": lambda *, amount: amount * 0.1,
+            "calculate_credit": lambda **kwargs: kwargs["age"] * 10 + kwargs["income"] / 1000
+        }
+        
+        inputs = {"Customer": {"age": 30, "income": 50000}, "Order": {"amount": 1000}}
+        outputs = {"Customer": ["is_adult", "credit_score"], "Order": ["tax"]}
+        
+        results = engine.execute(sample_project, inputs, outputs)
+        
+        # Verify each function is called the way its signature accepts
+        assert results["Customer"] == {"is_adult": True, "credit_score": 350}
+        assert results["Order"]["tax"] == 100
+    
+    def test_unhashable_function(self, sample_project):
+        # Register a callable object that cannot be hashed
+        class CheckAdult:
+            __hash__ = None
+            
+            def __call__(self, age):
+                return age >= 18
+        
+        engine = Engine()
+        engine.function_registry = {"check_adult": CheckAdult()}
+        
+        results = engine.execute(sample_project, {"Customer": {"age": 30}}, {"Customer": ["is_adult"]})
+        
+        assert results["Customer"]["is_adult"] is True
+    
+    def test_function_signature_mismatch(self, sample_project, caplog):
+        # Register a function that cannot accept the variable's single input
+        engine = Engine()
+        engine.function_registry = {"check_adult": lambda age, minimum_age: age >= minimum_age}
+        
+        results = engine.execute(sample_project, {"Customer": {"age": 30}}, {"Customer": ["is_adult"]})
+        
+        # Verify the mismatch is reported instead of calling the function
+        assert results["Customer"]["is_adult"] is None
+        assert "does not accept the input variables ['age'] of variable 'is_adult'" in caplog.text
+    
     def test_dependency_chain(self, sample_project):
         # Create a project with a chain of dependent variables
         entity = Entity(id="entity1", name="Test")
@@ -170,4 +214,90 @@ class TestEngine:
         results = engine.execute(project, inputs, outputs)
         
         # Verify dependency chain resolved correctly: 1 -> 2 -> 3 -> 4
-        assert results["Test"]["level3"] == 4
\ No newline at end of file
+        assert results["Test"]["level3"] == 4
+    
+    def test_circular_dependency(self):
+        # Create a project where two derived variables depend on each other
+        entity = Entity(id="entity1", name="Test")
+        variables = [
+            Variable(id="var1", name="a", entity_id="entity1", is_input=False, function_name="identity", metadata={"input_variables": ["b"]}),
+            Variable(id="var2", name="b", entity_id="entity1", is_input=False, function_name="identity", metadata={"input_variables": ["a"]}),
+        ]
+        
+        project = Project(id="project1", name="Test", entities=[entity], variables=variables)
+        
+        engine = Engine()
+        engine.function_registry = {"identity": lambda **kwargs: next(iter(kwargs.values()))}
+        
+        results = engine.execute(project, {}, {"Test": ["a"]})
+        
+        # Verify the cycle is reported as a missing value instead of recursing forever
+        assert results["Test"]["a"] is None
+    
+    def test_variable_name_shared_by_entities(self, engine_with_functions):
+        # Create a project where both entities have a variable with the same name
+        entities = [
+            Entity(id="entity1", name="Customer"),
+            Entity(id="entity2", name="Order")
+        ]
+        variables = [
+            Variable(id="var1", name="id", entity_id="entity1", is_input=True, function_name=None, metadata={}),
+            Variable(id="var2", name="id", entity_id="entity2", is_input=True, function_name=None, metadata={}),
+        ]
+        
+        project = Project(id="project1", name="Test", entities=entities, variables=variables)
+        
+        results = engine_with_functions.execute(project, {"Customer": {"id": "c1"}}, {"Customer": ["id"]})
+        
+        # Verify the variable is resolved within the requested entity
+        assert results["Customer"]["id"] == "c1"
+    
+    def test_dependency_name_shared_by_entities(self):
+        # Create a project where the dependency's name is used by a variable of each entity
+        entities = [
+            Entity(id="entity1", name="Customer"),
+            Entity(id="entity2", name="Order")
+        ]
+        variables = [
+            Variable(id="var1", name="total", entity_id="entity1", is_input=True, function_name=None, metadata={}),
+            Variable(id="var2", name="score", entity_id="entity1", is_input=False, function_name="double", metadata={"input_variables": ["total"]}),
+            Variable(id="var3", name="amount", entity_id="entity2", is_input=True, function_name=None, metadata={}),
+            Variable(id="var4", name="total", entity_id="entity2", is_input=False, function_name="negate", metadata={"input_variables": ["amount"]}),
+        ]
+        
+        project = Project(id="project1", name="Test", entities=entities, variables=variables)
+        
+        engine = Engine()
+        engine.function_registry = {"double": lambda total: total * 2, "negate": lambda amount: -amount}
+        
+        results = engine.execute(project, {"Customer": {"total": 5}, "Order": {"amount": 1}}, {"Customer": ["score"]})
+        
+        # Verify the dependency is resolved within the entity instead of to the other entity's variable
+        assert results["Customer"]["score"] == 10
+    
+    def test_shared_dependencies_are_calculated_once(self):
+        # Create a chain where every level is also requested as an output
+        entity = Entity(id="entity1", name="Test")
+        variables = [
+            Variable(id="var1", name="input1", entity_id="entity1", is_input=True, function_name=None, metadata={}),
+            Variable(id="var2", name="level1", entity_id="entity1", is_input=False, function_name="add_one", metadata={"input_variables": ["input1"]}),
+            Variable(id="var3", name="level2", entity_id="entity1", is_input=False, function_name="add_one", metadata={"input_variables": ["level1"]}),
+            Variable(id="var4", name="level3", entity_id="entity1", is_input=False, function_name="add_one", metadata={"input_variables": ["level2"]}),
+        ]
+        
+        project = Project(id="project1", name="Test", entities=[entity], variables=variables)
+        
+        calls = []
+        
+        def add_one(**kwargs):
+            calls.append(kwargs)
+            return next(iter(kwargs.values())) + 1
+        
+        engine = Engine()
+        engine.function_registry = {"add_one": add_one}
+        
+        results = engine.execute(project, {"Test": {"input1": 1}}, {"Test": ["level3", "level2", "level1"]})
+        
+        # Verify each derived variable was evaluated exactly once
+        assert results["Test"] == {"level3": 4, "level2": 3, "level1": 2}
+        assert len(calls) == 3